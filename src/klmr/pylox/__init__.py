@@ -1,7 +1,9 @@
 import sys
 
+from . import cache
 from .interpreter import Interpreter
 from .log import LoxLogger
+from .optimizer import fold_constants
 from .parser import parse
 from .resolver import resolve
 from .scanner import scan
@@ -26,7 +28,7 @@ def main() -> None:
 
 def run_script(script_path: str) -> None:
     with open(script_path, 'r') as script:
-        run(script.read())
+        run(script.read(), use_cache = True)
         if logger.had_error or logger.had_runtime_error:
             sys.exit(1)
 
@@ -39,15 +41,23 @@ def run_prompt() -> None:
             break
 
 
-def run(code: str) -> None:
+def run(code: str, use_cache: bool = False) -> None:
     logger.reset(code)
-    tokens = scan(code, logger)
-    stmts = parse(tokens, logger)
-    if logger.had_error:
-        return
+    stmts = cache.load(code) if use_cache else None
+
+    if stmts is None:
+        # All tokens are scanned before parsing starts; the logger puts the errors back in source order.
+        stmts = parse(scan(code, logger), logger)
+        if logger.had_error:
+            logger.flush()
+            return
+        fold_constants(stmts)
+        if use_cache:
+            cache.store(code, stmts)
 
     resolve(logger, interpreter, stmts)
     if logger.had_error:
+        logger.flush()
         return
 
     interpreter.interpret(stmts)
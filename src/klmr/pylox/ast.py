@@ -1,34 +1,56 @@
 from __future__ import annotations
-import abc
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import functools
+import re
+from typing import Any, ClassVar
 
 from .token import Token, TokenType
 
 
 # A type for AST node classes that have reference semantics (despite being data classes) and thus
-# can be hashed and compared efficiently.
-class AstNodeType(abc.ABCMeta):
+# can be hashed and compared efficiently: without a generated `__eq__`, nodes use the identity-based
+# `object.__eq__` and `object.__hash__`.
+# Node classes use slots rather than a per-instance `__dict__`. Since `dataclass` implements this by
+# creating a new class from the processed namespace, this metaclass runs twice per node class; the
+# second time round, `__slots__` is already present.
+# Each node class also records the name of the visitor method that handles it (e.g. `_visit_expr_stmt`
+# for `ExprStmt`), so that visitors can build their dispatch tables once rather than per node.
+class AstNodeType(type):
     def __new__(mcls, name, bases, ns, **kwargs):
         cls = super().__new__(mcls, name, bases, ns, **kwargs)
-        cls.__eq__ = lambda self, o: id(self) == id(o)
-        cls.__hash__ = lambda self: id(self)
-        return dataclass(eq = False)(cls)
+        if '__slots__' in ns:
+            return cls
+        cls.visit_name = '_visit' + re.sub('([A-Z])', r'_\1', name).lower()
+        return dataclass(eq = False, slots = True)(cls)
+
+
+# A field that is filled in after parsing, by the resolver or the interpreter, rather than by the parser.
+def _annotation(default: Any = None) -> Any:
+    return field(default = default, init = False, repr = False)
 
 
 class Expr(metaclass = AstNodeType):
     # Needed to silence spurious mypy warning.
     __match_args__ = ()
+    visit_name: ClassVar[str]
 
 
 class Assign(Expr):
     name: Token
     value: Expr
+    # Location of the variable, as resolved: the number of scopes up, and its slot in that scope.
+    # Globals are not resolved, and have no depth.
+    depth: int | None = _annotation()
+    slot: int = _annotation(0)
 
 
 class Binary(Expr):
     left: Expr
     operator: Token
     right: Expr
+    # The interpreter’s handler for `operator`, looked up on first evaluation.
+    handler: Any = _annotation()
 
 
 class Call(Expr):
@@ -40,6 +62,8 @@ class Call(Expr):
 class Get(Expr):
     object: Expr
     name: Token
+    # Inline cache for method lookups at this site: the class of the last receiver, and its method.
+    method_cache: tuple[Any, Any] | None = _annotation()
 
 
 class Grouping(Expr):
@@ -50,6 +74,11 @@ class Literal(Expr):
     value: object
 
 
+# Literal nodes are immutable and compared by identity, so parsing can share a single node between
+# all occurrences of the same constant. `typed` keeps e.g. `1.0` and `true` apart.
+make_literal = functools.lru_cache(maxsize = 1024, typed = True)(Literal)
+
+
 class Logical(Expr):
     left: Expr
     operator: Token
@@ -65,28 +94,38 @@ class Set(Expr):
 class Super(Expr):
     keyword: Token
     method: Token
+    depth: int | None = _annotation()
+    slot: int = _annotation(0)
 
 
 class This(Expr):
     keyword: Token
+    depth: int | None = _annotation()
+    slot: int = _annotation(0)
 
 
 class Unary(Expr):
     operator: Token
     operand: Expr
+    handler: Any = _annotation()
 
 
 class Variable(Expr):
     name: Token
+    depth: int | None = _annotation()
+    slot: int = _annotation(0)
 
 
 class Stmt(metaclass = AstNodeType):
     # Needed to silence spurious mypy warning.
     __match_args__ = ()
+    visit_name: ClassVar[str]
 
 
 class Block(Stmt):
     stmts: list[Stmt]
+    # Whether the block needs a scope of its own, which is only the case if it declares anything.
+    scoped: bool = _annotation(True)
 
 
 class Class(Stmt):
@@ -131,60 +170,163 @@ class WhileStmt(Stmt):
 
 
 def format_ast(expr: Expr | Stmt) -> str:
-    match expr:
-        case Assign(name, value):
-            return f'(= {name.lexeme} {format_ast(value)})'
-        case Binary(left, op, right):
-            return f'({op.lexeme} {format_ast(left)} {format_ast(right)})'
-        case Call(callee, _, args):
-            args_fmt = ' '.join(format_ast(arg) for arg in args)
-            return f'({format_ast(callee)} {args_fmt})'
-        case Get(object, name):
-            return f'(. {format_ast(object)} {name.lexeme})'
-        case Grouping(e):
-            return f'(group {format_ast(e)})'
-        case Literal(x):
-            return str(x)
-        case Logical(x):
-            return f'({op.lexeme} {format_ast(left)} {format_ast(right)})'
-        case Set(object, name, value):
-            return f'(= (. {format_ast(object)} {name.lexeme}) {format_ast(value)})'
-        case Super(_, method):
-            return f'(super {method.lexeme})'
-        case This(_):
-            return 'this'
-        case Unary(op, x):
-            return f'({op.lexeme} {format_ast(x)})'
-        case Variable(name):
-            return name.lexeme
-
-        case Block(stmts):
-            stmts_fmt = ' '.join(format_ast(stmt) for stmt in stmts)
-            return f'({{ {stmts_fmt})'
-        case Class(name, superclass, methods):
-            super_fmt = format_ast(superclass) if superclass else '_'
-            methods_fmt = ' '.join(format_ast(method) for method in methods)
-            return f'(class {name.lexeme} {super_fmt} {methods_fmt})'
-        case ExprStmt(e):
-            return format_ast(e)
-        case FunctionStmt(name, params, body):
-            params_fmt = ' '.join(param.lexeme for param in params)
-            body_fmt = ' '.join(format_ast(stmt) for stmt in body)
-            return f'(def {name.lexeme} ({params_fmt}) {body_fmt})'
-        case IfStmt(c, t, e):
-            else_fmt = format_ast(e) if e else ''
-            return f'(if {format_ast(c)} {format_ast(t)} {else_fmt})'
-        case PrintStmt(e):
-            return f'(print {format_ast(e)})'
-        case ReturnStmt(_, v):
-            return f'(return {format_ast(v) if v else ""})'
-        case VarStmt(name, init):
-            init_fmt = f' {format_ast(init)}' if init is not None else ''
-            return f'(var {name.lexeme}{init_fmt})'
-        case WhileStmt(cond, stmt):
-            return f'(while {format_ast(cond)} {format_ast(stmt)})'
-
-    assert False, 'Unhandled expr'
+    # Formatters emit their output piecewise into a single list rather than returning strings, so that
+    # each piece is copied once, instead of once per level of nesting above it.
+    parts: list[str] = []
+    _format(expr, parts.append)
+    return ''.join(parts)
+
+
+_Emit = Callable[[str], object]
+
+
+def _format(node: Expr | Stmt, emit: _Emit) -> None:
+    _FORMATTERS[type(node)](node, emit)
+
+
+def _format_all(nodes: list[Any], emit: _Emit) -> None:
+    for i, node in enumerate(nodes):
+        if i > 0:
+            emit(' ')
+        _format(node, emit)
+
+
+def _format_assign(expr: Assign, emit: _Emit) -> None:
+    emit(f'(= {expr.name.lexeme} ')
+    _format(expr.value, emit)
+    emit(')')
+
+
+def _format_binary(expr: Binary | Logical, emit: _Emit) -> None:
+    emit(f'({expr.operator.lexeme} ')
+    _format(expr.left, emit)
+    emit(' ')
+    _format(expr.right, emit)
+    emit(')')
+
+
+def _format_call(expr: Call, emit: _Emit) -> None:
+    emit('(')
+    _format(expr.callee, emit)
+    emit(' ')
+    _format_all(expr.args, emit)
+    emit(')')
+
+
+def _format_get(expr: Get, emit: _Emit) -> None:
+    emit('(. ')
+    _format(expr.object, emit)
+    emit(f' {expr.name.lexeme})')
+
+
+def _format_grouping(expr: Grouping, emit: _Emit) -> None:
+    emit('(group ')
+    _format(expr.expr, emit)
+    emit(')')
+
+
+def _format_set(expr: Set, emit: _Emit) -> None:
+    emit('(= (. ')
+    _format(expr.object, emit)
+    emit(f' {expr.name.lexeme}) ')
+    _format(expr.value, emit)
+    emit(')')
+
+
+def _format_unary(expr: Unary, emit: _Emit) -> None:
+    emit(f'({expr.operator.lexeme} ')
+    _format(expr.operand, emit)
+    emit(')')
+
+
+def _format_block(stmt: Block, emit: _Emit) -> None:
+    emit('({ ')
+    _format_all(stmt.stmts, emit)
+    emit(')')
+
+
+def _format_class(stmt: Class, emit: _Emit) -> None:
+    emit(f'(class {stmt.name.lexeme} ')
+    if stmt.superclass:
+        _format(stmt.superclass, emit)
+    else:
+        emit('_')
+    emit(' ')
+    _format_all(stmt.methods, emit)
+    emit(')')
+
+
+def _format_function(stmt: FunctionStmt, emit: _Emit) -> None:
+    params_fmt = ' '.join(param.lexeme for param in stmt.params)
+    emit(f'(def {stmt.name.lexeme} ({params_fmt}) ')
+    _format_all(stmt.body, emit)
+    emit(')')
+
+
+def _format_if(stmt: IfStmt, emit: _Emit) -> None:
+    emit('(if ')
+    _format(stmt.cond, emit)
+    emit(' ')
+    _format(stmt.then_branch, emit)
+    emit(' ')
+    if stmt.else_branch:
+        _format(stmt.else_branch, emit)
+    emit(')')
+
+
+def _format_print(stmt: PrintStmt, emit: _Emit) -> None:
+    emit('(print ')
+    _format(stmt.expr, emit)
+    emit(')')
+
+
+def _format_return(stmt: ReturnStmt, emit: _Emit) -> None:
+    emit('(return ')
+    if stmt.value:
+        _format(stmt.value, emit)
+    emit(')')
+
+
+def _format_var(stmt: VarStmt, emit: _Emit) -> None:
+    emit(f'(var {stmt.name.lexeme}')
+    if stmt.init is not None:
+        emit(' ')
+        _format(stmt.init, emit)
+    emit(')')
+
+
+def _format_while(stmt: WhileStmt, emit: _Emit) -> None:
+    emit('(while ')
+    _format(stmt.cond, emit)
+    emit(' ')
+    _format(stmt.body, emit)
+    emit(')')
+
+
+_FORMATTERS: dict[type, Callable[[Any, _Emit], object]] = {
+    Assign: _format_assign,
+    Binary: _format_binary,
+    Call: _format_call,
+    Get: _format_get,
+    Grouping: _format_grouping,
+    Literal: lambda e, emit: emit(str(e.value)),
+    Logical: _format_binary,
+    Set: _format_set,
+    Super: lambda e, emit: emit(f'(super {e.method.lexeme})'),
+    This: lambda e, emit: emit('this'),
+    Unary: _format_unary,
+    Variable: lambda e, emit: emit(e.name.lexeme),
+
+    Block: _format_block,
+    Class: _format_class,
+    ExprStmt: lambda s, emit: _format(s.expr, emit),
+    FunctionStmt: _format_function,
+    IfStmt: _format_if,
+    PrintStmt: _format_print,
+    ReturnStmt: _format_return,
+    VarStmt: _format_var,
+    WhileStmt: _format_while
+}
 
 
 if __name__ == '__main__':
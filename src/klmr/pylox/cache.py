@@ -0,0 +1,82 @@
+'''
+On-disk cache of parsed scripts, keyed by a hash of their source code.
+
+Only scripts that parsed without errors are cached. Resolution is not cached: it is a single cheap
+pass, and it reports its own errors, which would otherwise be lost on a cache hit.
+
+Entries are unpickled, which can run arbitrary code, so the cache directory must only be writable by
+its user. It is created that way, but an existing directory is used as is.
+
+Entries are kept per cache version. Storing an entry removes those of other versions, and those that
+have not been written for `_MAX_AGE`; otherwise the cache is not bounded in size.
+'''
+
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import shutil
+import time
+
+from .ast import Stmt
+
+
+# Bump this whenever the AST or token classes change shape, or constant folding changes its results,
+# to invalidate existing cache entries.
+_CACHE_VERSION = 7
+
+_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def load(source: str) -> list[Stmt] | None:
+    try:
+        with open(_cache_path(source), 'rb') as file:
+            return pickle.load(file)
+    except Exception:
+        # A missing, unreadable or stale cache entry just means that the script needs parsing.
+        return None
+
+
+def store(source: str, stmts: list[Stmt]) -> None:
+    tmp_path: Path | None = None
+    try:
+        path = _cache_path(source)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        path.parent.parent.mkdir(mode = 0o700, parents = True, exist_ok = True)
+        path.parent.mkdir(mode = 0o700, exist_ok = True)
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(stmts, file, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        _prune(path.parent)
+    except Exception:
+        # Caching is an optimization, failing to write the cache (say, because the AST is nested too
+        # deeply to be pickled) is not an error.
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok = True)
+
+
+def _prune(version_dir: Path) -> None:
+    # Entries of other versions can never be loaded again.
+    for entry in version_dir.parent.iterdir():
+        if entry == version_dir:
+            continue
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors = True)
+        else:
+            entry.unlink(missing_ok = True)
+
+    # This also removes temporary files left behind by crashed processes.
+    cutoff = time.time() - _MAX_AGE
+    for entry in version_dir.iterdir():
+        if entry.stat().st_mtime < cutoff:
+            entry.unlink(missing_ok = True)
+
+
+def _cache_path(source: str) -> Path:
+    key = hashlib.blake2b(source.encode(), digest_size = 16).hexdigest()
+    return _cache_dir() / f'v{_CACHE_VERSION}' / f'{key}.pickle'
+
+
+def _cache_dir() -> Path:
+    base = os.environ.get('XDG_CACHE_HOME')
+    return (Path(base) if base else Path.home() / '.cache') / 'pylox'
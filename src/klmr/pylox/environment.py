@@ -1,13 +1,50 @@
 from __future__ import annotations
-from typing import Final, cast
+from typing import Final
 
 from .log import LoxRuntimeError
 from .token import Token
 
 
 class Environment:
-    def __init__(self, enclosing: Environment | None = None) -> None:
+    '''
+    A local scope. Locals are stored in the order in which they are declared, which is the same order
+    in which the resolver assigns their slot indices, so accessing them does not need their names.
+    '''
+    __slots__ = ('enclosing', '_values', 'chain')
+
+    def __init__(self, enclosing: Environment | None = None, values: list[object] | None = None) -> None:
+        '''
+        Create a scope, optionally with its first locals already defined to `values`. The scope takes
+        ownership of the list.
+        '''
         self.enclosing: Final = enclosing
+        self._values: Final[list[object]] = [] if values is None else values
+        # The value lists of this scope and all its ancestors, nearest first, so that a resolved
+        # variable can be reached with a single index instead of walking the `enclosing` chain. The
+        # interpreter’s variable visitors index it directly, saving the call to `get_at`/`assign_at`.
+        self.chain: Final[tuple[list[object], ...]] = (
+            (self._values, *enclosing.chain) if enclosing else (self._values,)
+        )
+
+    def define(self, name: str, value: object) -> None:
+        self._values.append(value)
+
+    def get_at(self, dist: int, slot: int) -> object:
+        return self.chain[dist][slot]
+
+    def assign_at(self, dist: int, slot: int, value: object) -> None:
+        self.chain[dist][slot] = value
+
+
+class GlobalEnvironment(Environment):
+    '''
+    The global scope. Globals cannot be resolved statically (they may be used before their declaration
+    and redefined at will), so they are stored and looked up by name.
+    '''
+    __slots__ = ('_bindings',)
+
+    def __init__(self) -> None:
+        super().__init__()
         self._bindings: Final[dict[str, object]] = {}
 
     def define(self, name: str, value: object) -> None:
@@ -17,27 +54,9 @@ class Environment:
         try:
             return self._bindings[name.lexeme]
         except KeyError:
-            if self.enclosing is not None:
-                return self.enclosing.get(name)
-            else:
-                raise LoxRuntimeError(name, f'Undefined variable \'{name.lexeme}\'')
-
-    def get_at(self, dist: int, name: str) -> object:
-        return self._ancestor(dist)._bindings[name]
+            raise LoxRuntimeError(name, f'Undefined variable \'{name.lexeme}\'')
 
     def assign(self, name: Token, value: object) -> None:
-        if name.lexeme in self._bindings:
-            self._bindings[name.lexeme] = value
-        elif self.enclosing is not None:
-            self.enclosing.assign(name, value)
-        else:
+        if name.lexeme not in self._bindings:
             raise LoxRuntimeError(name, f'Undefined variable \'{name.lexeme}\'')
-
-    def assign_at(self, dist: int, name: Token, value: object) -> None:
-        self._ancestor(dist)._bindings[name.lexeme] = value
-
-    def _ancestor(self, dist: int) -> Environment:
-        env = self
-        for _ in range(dist):
-            env = cast(Environment, env.enclosing)
-        return env
+        self._bindings[name.lexeme] = value
@@ -1,76 +1,90 @@
 from __future__ import annotations
-import abc
 from collections.abc import Callable
 from inspect import signature
+import re
 import time
-from typing import Concatenate, ParamSpec, cast
+from typing import Any, Concatenate, ParamSpec, cast
 
 from .ast import (
     Assign, Binary, Block, Call, Class, Expr, ExprStmt, FunctionStmt, Get, Grouping, IfStmt, Literal, Logical,
     PrintStmt, ReturnStmt, Set, Stmt, Super, This, Unary, VarStmt, Variable, WhileStmt
 )
-from .environment import Environment
+from .environment import Environment, GlobalEnvironment
 from .log import Logger, LoxRuntimeError
+from .operators import BINARY_OPS, UNARY_OPS
 from .parser import Parser
 from .scanner import scan
-from .token import Token, TokenType
+from .token import TT, Token
 
 
-class Return(BaseException):
-    def __init__(self, value: object) -> None:
-        self.value = value
+# `this` is the only local in the scope that binds it, see `LoxFunction._bind_env`.
+_THIS_SLOT = 0
 
 
-class LoxCallable(abc.ABC):
+# Deliberately not an `abc.ABC`: every call checks that its callee is a `LoxCallable`, and `isinstance`
+# checks against ABCs are an order of magnitude slower than against plain classes.
+class LoxCallable:
+    __slots__ = ()
+
     @property
-    @abc.abstractmethod
     def arity(self) -> int:
-        pass
+        raise NotImplementedError
 
-    @abc.abstractmethod
     def __call__(self, interpreter: Interpreter, args: list[object]) -> object:
-        pass
+        raise NotImplementedError
 
 
 class LoxFunction(LoxCallable):
     # I’ve changed the nomenclature (“closure” -> “enclosing”) here, because I believe that the
     # nomenclature used in the book is incorrect: a closure is the thing that *carries* an enclosing
     # environment, i.e. the function itself.
+    __slots__ = ('_decl', '_enclosing', '_is_init')
+
     def __init__(self, decl: FunctionStmt, enclosing: Environment, is_init: bool) -> None:
         self._decl = decl
         self._enclosing = enclosing
         self._is_init = is_init
 
     def bind(self, instance: LoxInstance) -> LoxFunction:
-        env = Environment(self._enclosing)
-        env.define('this', instance)
-        return LoxFunction(self._decl, env, self._is_init)
+        return LoxFunction(self._decl, self._bind_env(instance), self._is_init)
+
+    def invoke(self, interpreter: Interpreter, instance: LoxInstance, args: list[object]) -> object:
+        '''
+        Call this method on `instance`. Equivalent to `self.bind(instance)(interpreter, args)`, but
+        without creating the bound method.
+        '''
+        return self._call(interpreter, args, self._bind_env(instance))
 
     @property
     def arity(self) -> int:
         return len(self._decl.params)
 
     def __call__(self, interpreter: Interpreter, args: list[object]) -> object:
-        env = Environment(self._enclosing)
-        for param, arg in zip(self._decl.params, args):
-            env.define(param.lexeme, arg)
+        return self._call(interpreter, args, self._enclosing)
 
-        try:
-            interpreter._execute_block(self._decl.body, env)
-        except Return as ret:
-            if self._is_init:
-                return self._enclosing.get_at(0, "this")
-            return ret.value
+    def _bind_env(self, instance: LoxInstance) -> Environment:
+        return Environment(self._enclosing, [instance])
+
+    def _call(self, interpreter: Interpreter, args: list[object], enclosing: Environment) -> object:
+        # Parameters are the first locals of the function’s scope, so the (fresh) argument list can
+        # serve as the scope’s storage as-is.
+        interpreter._execute_block(self._decl.body, Environment(enclosing, args))
+
+        value = interpreter._return_value
+        interpreter._returning = False
+        interpreter._return_value = None
 
         if self._is_init:
-            return self._enclosing.get_at(0, "this")
-        return None
+            return enclosing.get_at(0, _THIS_SLOT)
+        return value
 
     def __str__(self) -> str:
         return f'‹fun {self._decl.name.lexeme}›'
 
 
 class LoxInstance:
+    __slots__ = ('cls', 'fields')
+
     def __init__(self, cls: LoxClass) -> None:
         self.cls = cls
         self.fields: dict[str, object] = {}
@@ -92,20 +106,17 @@ class LoxInstance:
 
 
 class LoxClass(LoxCallable):
-    def __init__(self, name: str, superclass: LoxClass, methods: dict[str, LoxFunction]) -> None:
+    __slots__ = ('name', 'superclass', 'methods')
+
+    def __init__(self, name: str, superclass: LoxClass | None, methods: dict[str, LoxFunction]) -> None:
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        # Classes cannot change once they are defined, so inherited methods can be copied in up front
+        # rather than searched for along the superclass chain on every lookup.
+        self.methods: dict[str, LoxFunction] = {**superclass.methods, **methods} if superclass else methods
 
     def find_method(self, name: str) -> LoxFunction | None:
-        method = self.methods.get(name)
-
-        if method:
-            return method
-        elif self.superclass:
-            return self.superclass.find_method(name)
-        else:
-            return None
+        return self.methods.get(name)
 
     @property
     def arity(self) -> int:
@@ -116,7 +127,7 @@ class LoxClass(LoxCallable):
         instance = LoxInstance(self)
         init = self.find_method("init")
         if init:
-            init.bind(instance)(interpreter, args)
+            init.invoke(interpreter, instance, args)
         return instance
 
     def __str__(self) -> str:
@@ -125,285 +136,313 @@ class LoxClass(LoxCallable):
 
 class Interpreter:
     def __init__(self, logger: Logger) -> None:
-        self._globals = Environment()
-        self._env = self._globals
-        self._locals: dict[Expr, int] = {}
+        self._globals = GlobalEnvironment()
+        self._env: Environment = self._globals
         self._logger = logger
+        # Set by a `return` statement, which unwinds by having every enclosing block and loop stop
+        # early, until the call that is returning from clears it.
+        self._returning = False
+        self._return_value: object = None
 
         for name, fun in _native_funs.items():
             self._globals.define(name, fun)
 
+        self._stmt_handlers: dict[type[Stmt], Callable[[Any], None]] = self._handlers(
+            Block, Class, ExprStmt, FunctionStmt, IfStmt, PrintStmt, ReturnStmt, VarStmt, WhileStmt
+        )
+        self._expr_handlers: dict[type[Expr], Callable[[Any], object]] = self._handlers(
+            Assign, Binary, Call, Get, Grouping, Literal, Logical, Set, Super, This, Unary, Variable
+        )
+
     def interpret(self, stmts: list[Stmt]) -> None:
+        execute = self._execute
         try:
             for stmt in stmts:
-                self._execute(stmt)
+                execute(stmt)
         except LoxRuntimeError as e:
             self._logger.runtime_error(e)
 
     def eval(self, code: str) -> object:
+        return self.eval_expr(self.parse_expression(code))
+
+    def parse_expression(self, code: str) -> Expr:
+        try:
+            return Parser(scan(code, self._logger), self._logger).parse_expression()
+        finally:
+            self._logger.flush()
+
+    def eval_expr(self, expr: Expr) -> object:
         try:
-            expr = Parser(scan(code, self._logger), self._logger).parse_expression()
             return self._evaluate(expr)
         except LoxRuntimeError as e:
             self._logger.runtime_error(e)
             return None
 
-    def resolve(self, expr: Expr, depth: int) -> None:
-        self._locals[expr] = depth
+    def resolve(self, expr: Assign | Super | This | Variable, depth: int, slot: int) -> None:
+        expr.depth = depth
+        expr.slot = slot
+
+    def _handlers(self, *node_types: type[Any]) -> dict[type[Any], Callable[[Any], Any]]:
+        return {node_type: getattr(self, node_type.visit_name) for node_type in node_types}
 
     def _execute(self, stmt: Stmt) -> None:
-        match stmt:
-            case Block(stmts):
-                self._execute_block(stmts, Environment(self._env))
-            case Class(name, superclass_name, methods):
-                if superclass_name:
-                    superclass = self._evaluate(superclass_name)
-                    if not isinstance(superclass, LoxClass):
-                        raise LoxRuntimeError(superclass_name.name, 'Superclass must name a class')
-                else:
-                    superclass = None
-
-                self._env.define(name.lexeme, None)
-
-                if superclass:
-                    self._env = Environment(self._env)
-                    self._env.define('super', superclass)
-
-                defined_methods = {
-                    method.name.lexeme: LoxFunction(method, self._env, method.name.lexeme == 'init')
-                    for method in methods
-                }
-                cls = LoxClass(name.lexeme, superclass, defined_methods)
-
-                if superclass:
-                    self._env = self._env.enclosing
-
-                self._env.assign(name, cls)
-            case ExprStmt(expr):
-                self._evaluate(expr)
-            case FunctionStmt(name, _, _) as fdef:
-                function = LoxFunction(fdef, self._env, False)
-                self._env.define(name.lexeme, function)
-            case IfStmt(cond, then_branch, else_branch):
-                if _is_truthy(self._evaluate(cond)):
-                    self._execute(then_branch)
-                elif else_branch:
-                    self._execute(else_branch)
-            case PrintStmt(expr):
-                value = self._evaluate(expr)
-                print(_stringify(value))
-            case ReturnStmt(_, expr):
-                value = None if expr is None else self._evaluate(expr)
-                raise Return(value)
-            case VarStmt(name, init):
-                value = self._evaluate(init) if init is not None else None
-                self._env.define(name.lexeme, value)
-            case WhileStmt(cond, body):
-                while _is_truthy(self._evaluate(cond)):
-                    self._execute(body)
+        self._stmt_handlers[type(stmt)](stmt)
 
     def _execute_block(self, stmts: list[Stmt], env: Environment) -> None:
         prev = self._env
+        # Dispatch inline rather than via `_execute` to save a call per statement.
+        handlers = self._stmt_handlers
         try:
             self._env = env
             for stmt in stmts:
-                self._execute(stmt)
+                handlers[type(stmt)](stmt)
+                if self._returning:
+                    break
         finally:
             self._env = prev
 
+    # The hottest visitors look up their children’s handlers directly rather than going through
+    # `_execute` and `_evaluate`, which saves a Python call per node.
     def _evaluate(self, expr: Expr) -> object:
-        match expr:
-            case Assign(name, value):
-                val = self._evaluate(value)
-                self._assign_variable(name, expr, val)
-                return value
-            case Binary():
-                return self._visit_binary(expr)
-            case Call():
-                return self._visit_call(expr)
-            case Get(object, name):
-                obj = self._evaluate(object)
-                if not isinstance(obj, LoxInstance):
-                    raise LoxRuntimeError(name, 'Only instances have properties')
-                return obj.get(name)
-            case Grouping(x):
-                return self._evaluate(x)
-            case Literal(x):
-                return x
-            case Logical():
-                return self._visit_logical(expr)
-            case Set(object, name, value):
-                obj = self._evaluate(object)
-                if not isinstance(obj, LoxInstance):
-                    raise LoxRuntimeError(name, 'Only instances have fields')
-
-                val = self._evaluate(value)
-                obj.set(name, val)
-                return val
-            case Super(keyword, method_name):
-                dist = self._locals[expr]
-                superclass = cast(LoxClass, self._env.get_at(dist, 'super'))
-                object = cast(LoxInstance, self._env.get_at(dist - 1, 'this'))
-
-                method = superclass.find_method(method_name.lexeme)
-
-                if not method:
-                    raise LoxRuntimeError(method_name, f'Undefined property \'{method_name.lexeme}\'')
-                return method.bind(object)
-            case This(keyword):
-                return self._lookup_variable(keyword, expr)
-            case Unary():
-                return self._visit_unary(expr)
-            case Variable(name):
-                return self._lookup_variable(name, expr)
-
-        assert False, f'Unhandled expr {expr}'
+        return self._expr_handlers[type(expr)](expr)
 
-    def _visit_unary(self, expr: Unary) -> object:
-        operand = self._evaluate(expr.operand)
+    def _visit_block(self, stmt: Block) -> None:
+        self._execute_block(stmt.stmts, Environment(self._env) if stmt.scoped else self._env)
+
+    def _visit_class(self, stmt: Class) -> None:
+        if stmt.superclass:
+            superclass = self._evaluate(stmt.superclass)
+            if not isinstance(superclass, LoxClass):
+                raise LoxRuntimeError(stmt.superclass.name, 'Superclass must name a class')
+        else:
+            superclass = None
+
+        if superclass:
+            self._env = Environment(self._env)
+            self._env.define('super', superclass)
+
+        defined_methods = {
+            method.name.lexeme: LoxFunction(method, self._env, method.name.lexeme == 'init')
+            for method in stmt.methods
+        }
+        cls = LoxClass(stmt.name.lexeme, superclass, defined_methods)
+
+        if superclass:
+            self._env = cast(Environment, self._env.enclosing)
+
+        self._env.define(stmt.name.lexeme, cls)
+
+    def _visit_expr_stmt(self, stmt: ExprStmt) -> None:
+        expr = stmt.expr
+        self._expr_handlers[type(expr)](expr)
+
+    def _visit_function_stmt(self, stmt: FunctionStmt) -> None:
+        function = LoxFunction(stmt, self._env, False)
+        self._env.define(stmt.name.lexeme, function)
+
+    def _visit_if_stmt(self, stmt: IfStmt) -> None:
+        cond = stmt.cond
+        value = self._expr_handlers[type(cond)](cond)
+        if value is not None and value is not False:
+            self._stmt_handlers[type(stmt.then_branch)](stmt.then_branch)
+        elif stmt.else_branch:
+            self._stmt_handlers[type(stmt.else_branch)](stmt.else_branch)
+
+    def _visit_print_stmt(self, stmt: PrintStmt) -> None:
+        value = self._evaluate(stmt.expr)
+        print(_stringify(value))
+
+    def _visit_return_stmt(self, stmt: ReturnStmt) -> None:
+        value = stmt.value
+        self._return_value = None if value is None else self._expr_handlers[type(value)](value)
+        self._returning = True
+
+    def _visit_var_stmt(self, stmt: VarStmt) -> None:
+        value = self._evaluate(stmt.init) if stmt.init is not None else None
+        self._env.define(stmt.name.lexeme, value)
+
+    def _visit_while_stmt(self, stmt: WhileStmt) -> None:
+        cond, body = stmt.cond, stmt.body
+        evaluate_cond = self._expr_handlers[type(cond)]
+        execute_body = self._stmt_handlers[type(body)]
+        while (value := evaluate_cond(cond)) is not None and value is not False:
+            execute_body(body)
+            if self._returning:
+                break
+
+    def _visit_assign(self, expr: Assign) -> object:
+        value = self._evaluate(expr.value)
+        if expr.depth is None:
+            self._globals.assign(expr.name, value)
+        else:
+            self._env.chain[expr.depth][expr.slot] = value
+        return value
+
+    def _visit_get(self, expr: Get) -> object:
+        return self._get_property(expr, self._evaluate(expr.object))
 
-        match expr.operator.type:
-            case TokenType.MINUS:
-                _check_num_op(expr.operator, operand)
-                return - _as_number(operand)
-            case TokenType.BANG:
-                return not _is_truthy(operand)
+    def _get_property(self, expr: Get, obj: object) -> object:
+        if type(obj) is not LoxInstance:
+            raise LoxRuntimeError(expr.name, 'Only instances have properties')
 
-        assert False, f'Unhandled unary operator {expr.operator.type}'
+        try:
+            return obj.fields[expr.name.lexeme]
+        except KeyError:
+            return self._find_method(expr, obj).bind(obj)
+
+    def _find_method(self, expr: Get, obj: LoxInstance) -> LoxFunction:
+        # Classes are immutable, so a method found for a class stays valid for as long as the site
+        # keeps seeing instances of that class.
+        cache = expr.method_cache
+        if cache is not None and cache[0] is obj.cls:
+            return cache[1]
+
+        method = obj.cls.find_method(expr.name.lexeme)
+        if method is None:
+            raise LoxRuntimeError(expr.name, f'Undefined property \'{expr.name.lexeme}\'')
+        expr.method_cache = obj.cls, method
+        return method
+
+    def _visit_grouping(self, expr: Grouping) -> object:
+        return self._evaluate(expr.expr)
+
+    def _visit_literal(self, expr: Literal) -> object:
+        return expr.value
+
+    def _visit_set(self, expr: Set) -> object:
+        obj = self._evaluate(expr.object)
+        if type(obj) is not LoxInstance:
+            raise LoxRuntimeError(expr.name, 'Only instances have fields')
+
+        value = self._evaluate(expr.value)
+        obj.set(expr.name, value)
+        return value
+
+    def _visit_super(self, expr: Super) -> object:
+        if expr.depth is None:
+            # Only expressions interpolated by `printf` are evaluated without being resolved.
+            raise LoxRuntimeError(expr.keyword, 'Can’t use \'super\' outside of a class')
+        dist = expr.depth
+        superclass = cast(LoxClass, self._env.get_at(dist, expr.slot))
+        object = cast(LoxInstance, self._env.get_at(dist - 1, _THIS_SLOT))
+
+        method = superclass.find_method(expr.method.lexeme)
+
+        if not method:
+            raise LoxRuntimeError(expr.method, f'Undefined property \'{expr.method.lexeme}\'')
+        return method.bind(object)
+
+    def _visit_this(self, expr: This) -> object:
+        if expr.depth is None:
+            return self._globals.get(expr.keyword)
+        return self._env.chain[expr.depth][expr.slot]
+
+    def _visit_variable(self, expr: Variable) -> object:
+        if expr.depth is None:
+            return self._globals.get(expr.name)
+        return self._env.chain[expr.depth][expr.slot]
+
+    def _visit_unary(self, expr: Unary) -> object:
+        operand = self._evaluate(expr.operand)
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = UNARY_OPS[expr.operator.type]
+        return handler(expr.operator, operand)
 
     def _visit_binary(self, expr: Binary) -> object:
-        left = self._evaluate(expr.left)
-        right = self._evaluate(expr.right)
-        op = expr.operator
-
-        match op.type:
-            case TokenType.LT:
-                _check_num_ops(op, left, right)
-                return _as_number(left) < _as_number(right)
-            case TokenType.LT_EQ:
-                _check_num_ops(op, left, right)
-                return _as_number(left) <= _as_number(right)
-            case TokenType.GT:
-                _check_num_ops(op, left, right)
-                return _as_number(left) > _as_number(right)
-            case TokenType.GT_EQ:
-                _check_num_ops(op, left, right)
-                return _as_number(left) >= _as_number(right)
-            case TokenType.EQ_EQ:
-                return _is_equal(left, right)
-            case TokenType.BANG_EQ:
-                return not _is_equal(left, right)
-            case TokenType.MINUS:
-                _check_num_ops(op, left, right)
-                return _as_number(left) - _as_number(right)
-            case TokenType.SLASH:
-                _check_num_ops(op, left, right)
-                if _as_number(right) == 0:
-                    raise LoxRuntimeError(op, 'Cannot divide by zero')
-                return _as_number(left) / _as_number(right)
-            case TokenType.STAR:
-                _check_num_ops(op, left, right)
-                return _as_number(left) * _as_number(right)
-            case TokenType.PLUS:
-                if isinstance(left, float) and isinstance(right, float):
-                    return _as_number(left) + _as_number(right)
-                elif isinstance(left, str) and isinstance(right, str):
-                    return f'{left}{right}'
-
-                raise LoxRuntimeError(op, 'Operands must be two numbers or two strings')
-
-        assert False, f'Unhandled binary operator {op.type}'
+        handlers = self._expr_handlers
+        left = handlers[type(expr.left)](expr.left)
+        right_expr = expr.right
+        # Right operands are often constants (`i < 10`, `n - 1`), whose value can be read off directly.
+        right = right_expr.value if type(right_expr) is Literal else handlers[type(right_expr)](right_expr)
+        # A node’s operator never changes, so its handler only needs to be looked up once.
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = BINARY_OPS[expr.operator.type]
+        return handler(expr.operator, left, right)
 
     def _visit_logical(self, expr: Logical) -> object:
         left = self._evaluate(expr.left)
-        op = expr.operator
+        op_type = expr.operator.type
+        truthy = left is not None and left is not False
 
-        match op.type:
-            case TokenType.OR:
-                if _is_truthy(left):
-                    return left
-            case TokenType.AND:
-                if not _is_truthy(left):
-                    return left
+        if op_type is TT.OR:
+            if truthy:
+                return left
+        elif op_type is TT.AND:
+            if not truthy:
+                return left
 
         return self._evaluate(expr.right)
 
     def _visit_call(self, expr: Call) -> object:
-        callee = self._evaluate(expr.callee)
-
-        args = [self._evaluate(arg) for arg in expr.args]
+        handlers = self._expr_handlers
+        callee_expr = expr.callee
+        # Set if the call is a method call, which is invoked directly on its receiver rather than by
+        # binding the method to the receiver first.
+        method: LoxFunction | None = None
+        callee: object
+
+        if type(callee_expr) is Get:
+            obj = handlers[type(callee_expr.object)](callee_expr.object)
+            if type(obj) is LoxInstance and callee_expr.name.lexeme not in obj.fields:
+                callee = method = self._find_method(callee_expr, obj)
+            else:
+                callee = self._get_property(callee_expr, obj)
+        else:
+            callee = handlers[type(callee_expr)](callee_expr)
+
+        # Calls mostly take a single argument or none, and evaluating them directly saves setting up a
+        # list comprehension.
+        arg_exprs = expr.args
+        if len(arg_exprs) == 1:
+            arg = arg_exprs[0]
+            args = [handlers[type(arg)](arg)]
+        elif not arg_exprs:
+            args = []
+        else:
+            args = [handlers[type(arg)](arg) for arg in arg_exprs]
 
         if not isinstance(callee, LoxCallable):
             raise LoxRuntimeError(expr.paren, 'Can only call functions and classes')
 
         if len(args) != callee.arity:
             raise LoxRuntimeError(expr.paren, f'Expected {callee.arity} arguments but got {len(args)}')
-        return callee(self, args)
-
-    def _lookup_variable(self, name: Token, expr: Expr) -> object:
-        dist = self._locals.get(expr)
-        if dist is not None:
-            return self._env.get_at(dist, name.lexeme)
-        else:
-            return self._globals.get(name)
-
-    def _assign_variable(self, name: Token, expr: Expr, value: object) -> None:
-        dist = self._locals.get(expr)
-        if dist is not None:
-            self._env.assign_at(dist, name, value)
-        else:
-            self._globals.assign(name, value)
-
-
-def _is_truthy(x: object) -> bool:
-    match x:
-        case None:
-            return False
-        case bool(b):
-            return b
-        case _:
-            return True
-
-
-def _is_equal(x: object, y: object) -> bool:
-    match x, y:
-        case None, None:
-            return True
-        case None, _:
-            return False
-        case _:
-            return x == y
-
 
-def _as_number(x: object) -> float:
-    return float(cast(float, x))
-
-
-def _check_num_op(op: Token, x: object) -> None:
-    if not isinstance(x, float):
-        raise LoxRuntimeError(op, 'Operand must be a number')
-
-
-def _check_num_ops(op: Token, left: object, right: object) -> None:
-    if not (isinstance(left, float) and isinstance(right, float)):
-        raise LoxRuntimeError(op, 'Operands must be numbers')
+        if method is not None:
+            return method.invoke(self, cast(LoxInstance, obj), args)
+        return callee(self, args)
 
 
 def _stringify(x: object) -> str:
-    match x:
-        case None:
-            return 'nil'
-        case False:
-            return 'false'
-        case True:
-            return 'true'
-        case float():
-            text = str(x)
-            if text.endswith('.0'):
-                text = text[: -2]
-            return text
-        case _:
-            return str(x)
+    if type(x) is float:
+        return _stringify_number(x)
+    elif type(x) is str:
+        return x
+    elif x is None:
+        return 'nil'
+    elif x is True:
+        return 'true'
+    elif x is False:
+        return 'false'
+    else:
+        return str(x)
+
+
+# Programs tend to print the same few numbers (counters, constants) over and over again.
+_NUMBER_STRINGS: dict[float, str] = {}
+_NUMBER_STRINGS_MAX = 1024
+
+
+def _stringify_number(x: float) -> str:
+    string = _NUMBER_STRINGS.get(x)
+    if string is None:
+        # Integral floats below 1e16 are exactly the ones that `str` renders as digits plus '.0'.
+        string = f'{x:.0f}' if x.is_integer() and -1e16 < x < 1e16 else repr(x)
+        # Zeros are not cached because `0.0` and `-0.0` are equal as keys but are printed differently.
+        if x and len(_NUMBER_STRINGS) < _NUMBER_STRINGS_MAX:
+            _NUMBER_STRINGS[x] = string
+    return string
 
 
 P = ParamSpec('P')
@@ -415,16 +454,26 @@ _native_funs: dict[str, LoxCallable] = {}
 # FIXME: This currently doesn’t typecheck in mypy because support for `Concatenate` *just* got
 # merged (https://github.com/python/mypy/pull/11847). However, I think it’s correct.
 class native_fun_wrapper(LoxCallable):
+    __slots__ = ('_arity', '_call')
+
     def __init__(self, fun: Callable[Concatenate[Interpreter, P], object]) -> None:  # type: ignore[misc]
-        self._fun = fun
         self._arity = len(signature(fun).parameters) - 1
+        # Natives take few arguments; passing them positionally saves unpacking the argument list.
+        call = cast(Callable[..., object], fun)
+        self._call: Callable[[Interpreter, list[object]], object]
+        if self._arity == 0:
+            self._call = lambda interpreter, args: call(interpreter)
+        elif self._arity == 1:
+            self._call = lambda interpreter, args: call(interpreter, args[0])
+        else:
+            self._call = lambda interpreter, args: call(interpreter, *args)
 
     @property
     def arity(self) -> int:
         return self._arity
 
     def __call__(self, interpreter: 'Interpreter', args: list[object]) -> object:
-        return self._fun(interpreter, *args)
+        return self._call(interpreter, args)
 
     def __str__(self) -> str:
         return '‹native fun›'
@@ -441,15 +490,22 @@ def _lox_clock(interpreter: Interpreter) -> float:
     return time.time()
 
 
-@native_fun
-def _lox_printf(interpreter: Interpreter, format: str) -> None:
-    import re
+_PRINTF_PLACEHOLDER = re.compile(r'\{([^}]+)\}')
 
-    formatted = ''
-    for i, split in enumerate(re.split(r'\{([^}]+)\}', format)):
-        if i % 2 == 0:
-            formatted += split
-        else:
-            formatted += _stringify(interpreter.eval(split))
+# Parsed `printf` format strings: literal text, alternating with the expressions to interpolate.
+_printf_formats: dict[str, list[str | Expr]] = {}
+_PRINTF_FORMATS_MAX = 256
 
-    print(formatted)
+
+@native_fun
+def _lox_printf(interpreter: Interpreter, format: str) -> None:
+    parts = _printf_formats.get(format)
+    if parts is None:
+        parts = [
+            split if i % 2 == 0 else interpreter.parse_expression(split)
+            for i, split in enumerate(_PRINTF_PLACEHOLDER.split(format))
+        ]
+        if len(_printf_formats) < _PRINTF_FORMATS_MAX:
+            _printf_formats[format] = parts
+
+    print(''.join(part if isinstance(part, str) else _stringify(interpreter.eval_expr(part)) for part in parts))
@@ -1,4 +1,6 @@
 import abc
+from bisect import bisect_right
+import re
 import sys
 
 from .token import Token, TokenType
@@ -23,6 +25,11 @@ class Logger(abc.ABC):
     def runtime_error(self, error: LoxRuntimeError) -> None:
         pass
 
+    def flush(self) -> None:
+        '''
+        Output any errors that have been reported but not output yet.
+        '''
+
 
 class LoxLogger(Logger):
     def __init__(self) -> None:
@@ -32,35 +39,41 @@ class LoxLogger(Logger):
         self.had_error = False
         self.had_runtime_error = False
         self.source = source
+        # Offsets at which each line of `source` starts, computed on the first error.
+        self._line_starts: list[int] | None = None
+        # Static errors are collected while the code is parsed and resolved, and output together, in
+        # source order: the scanner runs ahead of the parser, so its errors are reported first.
+        self._errors: list[tuple[int, int, str]] = []
 
     def scan_error(self, position: tuple[int, int], message: str) -> None:
         self._report(position, '', message)
 
     def parse_error(self, token: Token, message: str) -> None:
-        position = position_from_offset(self.source, token.offset)
-        if token.type == TokenType.EOF:
+        position = self._position(token.offset)
+        if token.type is TokenType.EOF:
             self._report(position, ' at end', message)
         else:
             self._report(position, f' at {token.lexeme}', message)
 
     def runtime_error(self, error: LoxRuntimeError) -> None:
-        line, col = position_from_offset(self.source, error.op.offset)
+        line, col = self._position(error.op.offset)
+        self.flush()
         sys.stderr.write(f'[ln {line}/col {col}] Error: {error}\n')
         self.had_runtime_error = True
 
+    def flush(self) -> None:
+        if self._errors:
+            self._errors.sort(key = lambda error: error[: 2])
+            sys.stderr.write(''.join(message for _, _, message in self._errors))
+            self._errors.clear()
+
+    def _position(self, offset: int) -> tuple[int, int]:
+        if self._line_starts is None:
+            self._line_starts = [0, *(match.end() for match in re.finditer('\n', self.source))]
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1]
+
     def _report(self, position: tuple[int, int], where: str, message: str) -> None:
         line, col = position
-        sys.stderr.write(f'[ln {line}/col {col}] Error{where}: {message}\n')
+        self._errors.append((line, col, f'[ln {line}/col {col}] Error{where}: {message}\n'))
         self.had_error = True
-
-
-def position_from_offset(source: str, offset: int) -> tuple[int, int]:
-    line, col = 1, 0
-    for i in range(offset):
-        if source[i] == '\n':
-            line += 1
-            col = 0
-        else:
-            col += 1
-
-    return line, col
@@ -0,0 +1,118 @@
+'''
+Operator semantics, shared by the interpreter and the constant folder: each operator token type maps
+to the handler that evaluates it.
+'''
+
+from collections.abc import Callable
+from typing import Any
+
+from .log import LoxRuntimeError
+from .token import Token, TokenType
+
+
+# Operators are evaluated by handlers that take the operator token (for error reporting) and the
+# evaluated operands, and that each perform only the type checks their operator needs.
+UnaryHandler = Callable[[Token, Any], object]
+BinaryHandler = Callable[[Token, Any, Any], object]
+
+
+def _unary_minus(op: Token, operand: object) -> object:
+    if type(operand) is not float:
+        raise LoxRuntimeError(op, 'Operand must be a number')
+    return - operand
+
+
+# `nil` and `false` are the only falsey values, and they are singletons, so identity checks suffice.
+# The same test is inlined in the `if`, `while` and logical operator visitors.
+def _unary_bang(op: Token, operand: object) -> object:
+    return operand is None or operand is False
+
+
+UNARY_OPS: dict[TokenType, UnaryHandler] = {
+    TokenType.MINUS: _unary_minus,
+    TokenType.BANG: _unary_bang
+}
+
+
+# The numeric operators each test for float operands inline, and do the operation directly on them,
+# since this is the path that arithmetic-heavy code spends most of its time on.
+def _binary_lt(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        return left < right
+    raise _expected_numbers(op)
+
+
+def _binary_lt_eq(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        return left <= right
+    raise _expected_numbers(op)
+
+
+def _binary_gt(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        return left > right
+    raise _expected_numbers(op)
+
+
+def _binary_gt_eq(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        return left >= right
+    raise _expected_numbers(op)
+
+
+def _binary_minus(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        return left - right
+    raise _expected_numbers(op)
+
+
+def _binary_star(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        return left * right
+    raise _expected_numbers(op)
+
+
+def _binary_slash(op: Token, left: Any, right: Any) -> object:
+    if type(left) is float and type(right) is float:
+        try:
+            return left / right
+        except ZeroDivisionError:
+            raise LoxRuntimeError(op, 'Cannot divide by zero')
+    raise _expected_numbers(op)
+
+
+def _expected_numbers(op: Token) -> LoxRuntimeError:
+    return LoxRuntimeError(op, 'Operands must be numbers')
+
+
+def _binary_plus(op: Token, left: Any, right: Any) -> object:
+    # `+` is overloaded for numbers and strings, and the operands have to match. Both cases add with
+    # the same Python operator, so one test of the operand types covers them.
+    left_type = type(left)
+    if left_type is type(right) and (left_type is float or left_type is str):
+        return left + right
+    raise LoxRuntimeError(op, 'Operands must be two numbers or two strings')
+
+
+# Values of different types are never equal in Lox, whereas Python considers `True == 1.0`. Within a
+# type, Python equality matches Lox’s: instances and callables compare by identity.
+def _binary_eq_eq(op: Token, left: object, right: object) -> object:
+    return type(left) is type(right) and left == right
+
+
+def _binary_bang_eq(op: Token, left: object, right: object) -> object:
+    return type(left) is not type(right) or left != right
+
+
+BINARY_OPS: dict[TokenType, BinaryHandler] = {
+    TokenType.LT: _binary_lt,
+    TokenType.LT_EQ: _binary_lt_eq,
+    TokenType.GT: _binary_gt,
+    TokenType.GT_EQ: _binary_gt_eq,
+    TokenType.EQ_EQ: _binary_eq_eq,
+    TokenType.BANG_EQ: _binary_bang_eq,
+    TokenType.PLUS: _binary_plus,
+    TokenType.MINUS: _binary_minus,
+    TokenType.SLASH: _binary_slash,
+    TokenType.STAR: _binary_star
+}
@@ -0,0 +1,57 @@
+'''
+Constant folding: operator expressions whose operands are all literals are replaced by the literal
+they evaluate to, so that they are computed once, rather than every time they are executed.
+
+Expressions that would fail at runtime (say, `1 / 0`) are left alone, so that the error is still
+reported when (and if) they are executed.
+
+Groupings only matter to the parser and to formatting, so they are removed along the way.
+'''
+
+from dataclasses import fields
+from typing import Any
+
+from .ast import Binary, Expr, Grouping, Literal, Stmt, Unary
+from .log import LoxRuntimeError
+from .operators import BINARY_OPS, UNARY_OPS
+
+
+def fold_constants(stmts: list[Stmt]) -> None:
+    for stmt in stmts:
+        _fold_children(stmt)
+
+
+def _fold(node: Any) -> Any:
+    '''
+    Fold the constant subexpressions of `node`, and return either `node` itself or, if it is constant
+    as a whole, the literal it evaluates to.
+    '''
+    _fold_children(node)
+
+    # Folded values are wrapped with `Literal` rather than `make_literal`, whose cache conflates `0.0`
+    # and `-0.0`, which the parser never produces but folding can.
+    try:
+        match node:
+            case Grouping(expr):
+                return expr
+            case Unary(op, Literal(operand)):
+                return Literal(UNARY_OPS[op.type](op, operand))
+            case Binary(Literal(left), op, Literal(right)):
+                return Literal(BINARY_OPS[op.type](op, left, right))
+    except LoxRuntimeError:
+        pass
+
+    return node
+
+
+def _fold_children(node: Any) -> None:
+    for field in fields(node):
+        # Non-init fields are annotations added after parsing, not child nodes.
+        if not field.init:
+            continue
+
+        value = getattr(node, field.name)
+        if isinstance(value, Expr | Stmt):
+            setattr(node, field.name, _fold(value))
+        elif isinstance(value, list):
+            value[:] = [_fold(item) if isinstance(item, Expr | Stmt) else item for item in value]
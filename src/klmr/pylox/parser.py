@@ -1,14 +1,16 @@
-from collections.abc import Iterable
+from collections.abc import Callable
+import functools
+import operator
 
 from .ast import (
-    Assign, Binary, Block, Call, Class, Expr, ExprStmt, FunctionStmt, Get, Grouping, IfStmt, Literal, Logical,
-    PrintStmt, ReturnStmt, Set, Stmt, Super, This, Unary, VarStmt, Variable, WhileStmt
+    Assign, Binary, Block, Call, Class, Expr, ExprStmt, FunctionStmt, Get, Grouping, IfStmt, Logical,
+    PrintStmt, ReturnStmt, Set, Stmt, Super, This, Unary, VarStmt, Variable, WhileStmt, make_literal
 )
 from .log import Logger, LoxLogger
-from .token import Token, TokenType as TT
+from .token import TT, Token, TokenType
 
 
-def parse(tokens: Iterable[Token], logger: Logger) -> list[Stmt]:
+def parse(tokens: list[Token], logger: Logger) -> list[Stmt]:
     return Parser(tokens, logger).parse()
 
 
@@ -16,10 +18,38 @@ class _ParseError(RuntimeError):
     pass
 
 
+def _mask(*types: TokenType) -> int:
+    return functools.reduce(operator.or_, (type.mask for type in types))
+
+
+# Binding strength of the (all left-associative) binary and logical operators; higher binds tighter.
+_PRECEDENCE = {
+    TT.OR: 1,
+    TT.AND: 2,
+    TT.BANG_EQ: 3, TT.EQ_EQ: 3,
+    TT.GT: 4, TT.GT_EQ: 4, TT.LT: 4, TT.LT_EQ: 4,
+    TT.MINUS: 5, TT.PLUS: 5,
+    TT.SLASH: 6, TT.STAR: 6,
+}
+
+_LOGICAL_OPS = _mask(TT.AND, TT.OR)
+
+# Tokens that form an expression on their own, and tokens that can follow a complete expression.
+_ATOMS = _mask(TT.FALSE, TT.IDENTIFIER, TT.NIL, TT.NUMBER, TT.STRING, TT.THIS, TT.TRUE)
+_EXPRESSION_ENDS = _mask(TT.COMMA, TT.RIGHT_PAREN, TT.SEMICOLON)
+
+_UNARY_OPS = _mask(TT.BANG, TT.MINUS)
+_LITERALS = _mask(TT.NUMBER, TT.STRING)
+_CONSTANTS = {TT.FALSE: make_literal(False), TT.TRUE: make_literal(True), TT.NIL: make_literal(None)}
+# Keywords that start a declaration or statement, where parsing resumes after an error.
+_SYNC_POINTS = _mask(TT.CLASS, TT.FUN, TT.VAR, TT.FOR, TT.IF, TT.WHILE, TT.PRINT, TT.RETURN)
+
+
 class Parser:
-    def __init__(self, tokens: Iterable[Token], logger: Logger) -> None:
-        self._tokens = iter(tokens)
-        self._curr = next(self._tokens)
+    def __init__(self, tokens: list[Token], logger: Logger) -> None:
+        self._tokens = tokens
+        self._pos = 0
+        self._curr = self._tokens[0]
         self._logger = logger
 
     def parse(self) -> list[Stmt]:
@@ -45,11 +75,11 @@ class Parser:
                      | statement ;
         '''
         try:
-            if self._match_one_of(TT.CLASS):
+            if self._match(TT.CLASS):
                 return self._class_decl()
-            if self._match_one_of(TT.VAR):
+            if self._match(TT.VAR):
                 return self._var_decl()
-            elif self._match_one_of(TT.FUN):
+            elif self._match(TT.FUN):
                 return self._fun_decl("function")
             else:
                 return self._statement()
@@ -63,7 +93,7 @@ class Parser:
         '''
         name = self._consume(TT.IDENTIFIER, 'Expected class name')
 
-        if self._match_one_of(TT.LT):
+        if self._match(TT.LT):
             superclass = Variable(self._consume(TT.IDENTIFIER, 'Expected superclass name'))
         else:
             superclass = None
@@ -82,7 +112,7 @@ class Parser:
         var_decl -> "var" IDENTIFIER ( "=" expression )? ";" ;
         '''
         name = self._consume(TT.IDENTIFIER, 'Expected variable name')
-        init = self._expression() if self._match_one_of(TT.EQ) else None
+        init = self._expression() if self._match(TT.EQ) else None
 
         self._consume(TT.SEMICOLON, 'Expected \';\' after variable declaration')
         return VarStmt(name, init)
@@ -102,7 +132,7 @@ class Parser:
                 if len(params) > 254:
                     self._error(self._curr, 'Can’t have more than 255 parameters')
                 params.append(self._consume(TT.IDENTIFIER, 'Expected parameter name'))
-                if not self._match_one_of(TT.COMMA):
+                if not self._match(TT.COMMA):
                     break
 
         self._consume(TT.RIGHT_PAREN, 'Expected \')\' after parameters')
@@ -120,20 +150,10 @@ class Parser:
                    | while_stmt
                    | block ;
         '''
-        if self._match_one_of(TT.FOR):
-            return self._for_statement()
-        elif self._match_one_of(TT.IF):
-            return self._if_statement()
-        elif self._match_one_of(TT.PRINT):
-            return self._print_statement()
-        elif keyword := self._match_one_of(TT.RETURN):
-            return self._return_statement(keyword)
-        elif self._match_one_of(TT.WHILE):
-            return self._while_statement()
-        elif self._match_one_of(TT.LEFT_BRACE):
-            return Block(self._block())
-        else:
+        statement = _STATEMENTS.get(self._curr.type)
+        if statement is None:
             return self._expression_statement()
+        return statement(self, self._advance())
 
     def _for_statement(self) -> Stmt:
         '''
@@ -145,14 +165,14 @@ class Parser:
         '''
         self._consume(TT.LEFT_PAREN, 'Expected \'(\' after \'for\'')
 
-        if self._match_one_of(TT.SEMICOLON):
+        if self._match(TT.SEMICOLON):
             init = None
-        elif self._match_one_of(TT.VAR):
+        elif self._match(TT.VAR):
             init = self._var_decl()
         else:
             init = self._expression_statement()
 
-        cond = self._expression() if not self._check(TT.SEMICOLON) else Literal(True)
+        cond = self._expression() if not self._check(TT.SEMICOLON) else make_literal(True)
         self._consume(TT.SEMICOLON, 'Expected \';\' after loop condition')
 
         incr = self._expression() if not self._check(TT.RIGHT_PAREN) else None
@@ -179,7 +199,7 @@ class Parser:
         self._consume(TT.RIGHT_PAREN, 'Expected \')\' after if condition')
 
         then_branch = self._statement()
-        else_branch = self._statement() if self._match_one_of(TT.ELSE) else None
+        else_branch = self._statement() if self._match(TT.ELSE) else None
 
         return IfStmt(cond, then_branch, else_branch)
 
@@ -235,6 +255,10 @@ class Parser:
         '''
         expression -> assignment ;
         '''
+        # Lone operands (as in `print x;`, `f(a, 1)` or `return nil;`) are common, and can be parsed
+        # directly, skipping the descent through all operator levels, none of which would match.
+        if self._curr.type.mask & _ATOMS and self._tokens[self._pos + 1].type.mask & _EXPRESSION_ENDS:
+            return self._primary()
         return self._assignment()
 
     def _assignment(self) -> Expr:
@@ -242,8 +266,8 @@ class Parser:
         assignment -> ( call "." )? IDENTIFIER "=" assignment
                     | logical_or ;
         '''
-        expr = self._or()
-        if eq := self._match_one_of(TT.EQ):
+        expr = self._binary()
+        if eq := self._match(TT.EQ):
             value = self._assignment()
 
             if isinstance(expr, Variable):
@@ -255,71 +279,24 @@ class Parser:
 
         return expr
 
-    def _or(self) -> Expr:
+    def _binary(self, min_prec: int = 1) -> Expr:
         '''
         logical_or -> logical_and ( "or" logical_and )* ;
-        '''
-        expr = self._and()
-
-        while op := self._match_one_of(TT.OR):
-            right = self._and()
-            expr = Logical(expr, op, right)
-
-        return expr
-
-    def _and(self) -> Expr:
-        '''
         logical_and -> equality ( "and" equality )* ;
-        '''
-        expr = self._equality()
-
-        while op := self._match_one_of(TT.AND):
-            right = self._equality()
-            expr = Logical(expr, op, right)
-
-        return expr
-
-    def _equality(self) -> Expr:
-        '''
         equality -> comparison ( ( "!=" | "==" ) comparison )* ;
-        '''
-        expr = self._comparison()
-        while op := self._match_one_of(TT.BANG_EQ, TT.EQ_EQ):
-            right = self._comparison()
-            expr = Binary(expr, op, right)
-
-        return expr
-
-    def _comparison(self) -> Expr:
-        '''
         comparison -> term ( ( ">" | ">=" | "<" | "<=" ) term )* ;
-        '''
-        expr = self._term()
-        while op := self._match_one_of(TT.GT, TT.GT_EQ, TT.LT, TT.LT_EQ):
-            right = self._term()
-            expr = Binary(expr, op, right)
-
-        return expr
-
-    def _term(self) -> Expr:
-        '''
         term -> factor ( ( "-" | "+" ) factor )* ;
-        '''
-        expr = self._factor()
-        while op := self._match_one_of(TT.MINUS, TT.PLUS):
-            right = self._factor()
-            expr = Binary(expr, op, right)
-
-        return expr
-
-    def _factor(self) -> Expr:
-        '''
         factor -> unary ( ( "/" | "*" ) unary )* ;
+
+        All six levels are parsed by precedence climbing over `_PRECEDENCE`, rather than by one
+        method per level.
         '''
         expr = self._unary()
-        while op := self._match_one_of(TT.SLASH, TT.STAR):
-            right = self._unary()
-            expr = Binary(expr, op, right)
+
+        while (prec := _PRECEDENCE.get(self._curr.type, 0)) >= min_prec:
+            op = self._advance()
+            right = self._binary(prec + 1)
+            expr = Logical(expr, op, right) if op.type.mask & _LOGICAL_OPS else Binary(expr, op, right)
 
         return expr
 
@@ -329,10 +306,10 @@ class Parser:
                | "+" unary { error }
                | call
         '''
-        if op := self._match_one_of(TT.BANG, TT.MINUS):
+        if op := self._match_any(_UNARY_OPS):
             right = self._unary()
             return Unary(op, right)
-        elif op := self._match_one_of(TT.PLUS):
+        elif op := self._match(TT.PLUS):
             self._unary()
             raise self._error(op, 'Prefix-plus is not supported')
         else:
@@ -346,9 +323,9 @@ class Parser:
         expr = self._primary()
 
         while True:
-            if self._match_one_of(TT.LEFT_PAREN):
+            if self._match(TT.LEFT_PAREN):
                 expr = self._finish_call(expr)
-            elif self._match_one_of(TT.DOT):
+            elif self._match(TT.DOT):
                 name = self._consume(TT.IDENTIFIER, 'Expected property name after \'.\'')
                 expr = Get(expr, name)
             else:
@@ -364,23 +341,20 @@ class Parser:
                  | "(" expression ")"
                  | "super" "." IDENTIFIER ;
         '''
-        if self._match_one_of(TT.FALSE):
-            return Literal(False)
-        elif self._match_one_of(TT.TRUE):
-            return Literal(True)
-        elif self._match_one_of(TT.NIL):
-            return Literal(None)
-        elif lit := self._match_one_of(TT.NUMBER, TT.STRING):
-            return Literal(lit.literal)
-        elif keyword := self._match_one_of(TT.SUPER):
+        if (constant := _CONSTANTS.get(self._curr.type)) is not None:
+            self._advance()
+            return constant
+        elif lit := self._match_any(_LITERALS):
+            return make_literal(lit.literal)
+        elif keyword := self._match(TT.SUPER):
             self._consume(TT.DOT, 'Expected \'.\' after \'super\'')
             method = self._consume(TT.IDENTIFIER, 'Expected superclass method name')
             return Super(keyword, method)
-        elif keyword := self._match_one_of(TT.THIS):
+        elif keyword := self._match(TT.THIS):
             return This(keyword)
-        elif var := self._match_one_of(TT.IDENTIFIER):
+        elif var := self._match(TT.IDENTIFIER):
             return Variable(var)
-        elif self._match_one_of(TT.LEFT_PAREN):
+        elif self._match(TT.LEFT_PAREN):
             expr = self._expression()
             self._consume(TT.RIGHT_PAREN, 'Expected \')\' after expression')
             return Grouping(expr)
@@ -395,32 +369,42 @@ class Parser:
                 if len(args) > 254:
                     self._error(self._curr, 'Can’t have more than 255 arguments')
                 args.append(self._expression())
-                if not self._match_one_of(TT.COMMA):
+                if not self._match(TT.COMMA):
                     break
 
         paren = self._consume(TT.RIGHT_PAREN, 'Expected \')\' after arguments')
         return Call(callee, paren, args)
 
-    def _match_one_of(self, *types: TT) -> Token | None:
-        for type in types:
-            if self._check(type):
-                return self._advance()
+    # `_match`, `_match_any` and `_consume` test the current token inline rather than via `_check`,
+    # since they run for nearly every token.
+    def _match(self, type: TokenType) -> Token | None:
+        if self._curr.type is type:
+            return self._advance()
         return None
 
-    def _check(self, type: TT) -> bool:
-        return self._curr.type == type
+    def _match_any(self, types: int) -> Token | None:
+        '''
+        Match a token of any of the given types, represented as a bit mask of token types.
+        '''
+        if self._curr.type.mask & types:
+            return self._advance()
+        return None
+
+    def _check(self, type: TokenType) -> bool:
+        return self._curr.type is type
 
     def _advance(self) -> Token:
         curr = self._curr
-        if not self._at_end():
-            self._curr = next(self._tokens)
+        if curr.type is not TT.EOF:
+            self._pos += 1
+            self._curr = self._tokens[self._pos]
         return curr
 
     def _at_end(self) -> bool:
-        return self._check(TT.EOF)
+        return self._curr.type is TT.EOF
 
-    def _consume(self, type: TT, error_msg: str) -> Token:
-        if self._check(type):
+    def _consume(self, type: TokenType, error_msg: str) -> Token:
+        if self._curr.type is type:
             return self._advance()
         raise self._error(self._curr, error_msg)
 
@@ -431,15 +415,27 @@ class Parser:
     def _synchronize(self) -> None:
         prev = self._advance()
         while not self._at_end():
-            if prev.type == TT.SEMICOLON:
+            if prev.type is TT.SEMICOLON:
                 return
 
-            if self._curr.type in (TT.CLASS, TT.FUN, TT.VAR, TT.FOR, TT.IF, TT.WHILE, TT.PRINT, TT.RETURN):
+            if self._curr.type.mask & _SYNC_POINTS:
                 return
 
             prev = self._advance()
 
 
+# Parsers of the statements that start with a keyword (or brace), which they are passed after it
+# has been consumed.
+_STATEMENTS: dict[TokenType, Callable[[Parser, Token], Stmt]] = {
+    TT.FOR: lambda parser, _: parser._for_statement(),
+    TT.IF: lambda parser, _: parser._if_statement(),
+    TT.PRINT: lambda parser, _: parser._print_statement(),
+    TT.RETURN: Parser._return_statement,
+    TT.WHILE: lambda parser, _: parser._while_statement(),
+    TT.LEFT_BRACE: lambda parser, _: Block(parser._block()),
+}
+
+
 if __name__ == '__main__':
     from .scanner import scan
     from .ast import format_ast
@@ -449,5 +445,6 @@ if __name__ == '__main__':
     logger = LoxLogger()
     logger.reset(source)
     stmts = parse(scan(source, logger), logger)
+    logger.flush()
     for stmt in stmts:
         print(format_ast(stmt))
@@ -1,4 +1,8 @@
+from collections import defaultdict
+from collections.abc import Callable
 from enum import Enum
+from typing import Any
+
 from .ast import (
     Assign, Binary, Block, Call, Class, Expr, ExprStmt, FunctionStmt, Get, Grouping, IfStmt, Literal, Logical,
     PrintStmt, ReturnStmt, Set, Stmt, Super, This, Unary, VarStmt, Variable, WhileStmt
@@ -25,143 +29,197 @@ class _FunctionType(Enum):
     METHOD = 3
 
 
+class _Local:
+    def __init__(self, scope: int, slot: int, defined: bool = False) -> None:
+        self.scope = scope
+        self.slot = slot
+        self.defined = defined
+
+
 class Resolver:
     def __init__(self, logger: Logger, interpreter: Interpreter) -> None:
-        self._scopes: list[dict[str, bool]] = []
+        self._scopes: list[dict[str, _Local]] = []
+        # The locals in scope for each name, innermost last, so that a name is resolved without
+        # searching through the scopes that don't declare it.
+        self._bindings: defaultdict[str, list[_Local]] = defaultdict(list)
         self._current_fun = _FunctionType.NONE
         self._current_class = _ClassType.NONE
         self._logger = logger
         self._interpreter = interpreter
+        # Nodes are dispatched on their exact type, like in the interpreter.
+        self._handlers: dict[type[Any], Callable[[Any], None]] = {
+            node_type: getattr(self, node_type.visit_name) for node_type in (
+                Assign, Binary, Block, Call, Class, ExprStmt, FunctionStmt, Get, Grouping, IfStmt, Literal,
+                Logical, PrintStmt, ReturnStmt, Set, Super, This, Unary, VarStmt, Variable, WhileStmt
+            )
+        }
 
     def resolve_stmts(self, stmts: list[Stmt]) -> None:
         for stmt in stmts:
             self.resolve(stmt)
 
     def resolve(self, x: Expr | Stmt | None) -> None:
-        match x:
-            case None | Literal():
-                pass
-            case Assign(name, value):
-                self.resolve(value)
-                self._resolve_local(x, name)
-            case Binary(left, _, right):
-                self.resolve(left)
-                self.resolve(right)
-            case Block(stmts):
-                self._begin_scope()
-                self.resolve_stmts(stmts)
-                self._end_scope()
-            case Call(callee, _, args):
-                self.resolve(callee)
-                for arg in args:
-                    self.resolve(arg)
-            case Class(name, superclass, methods):
-                enclosing_class = self._current_class
-                self._current_class = _ClassType.CLASS
-
-                self._declare(name)
-                self._define(name)
-
-                if superclass:
-                    if name.lexeme == superclass.name.lexeme:
-                        self._logger.parse_error(superclass.name, 'a class can’t inherit from itself')
-
-                    self._current_class = _ClassType.SUBCLASS
-                    self.resolve(superclass)
-
-                    self._begin_scope()
-                    self._scopes[-1]['super'] = True
-
-                self._begin_scope()
-                self._scopes[-1]['this'] = True
-
-                for method in methods:
-                    decl = _FunctionType.INITIALIZER if method.name.lexeme == 'init' else _FunctionType.METHOD
-                    self._resolve_fun(method.params, method.body, decl)
-
-                self._end_scope()
-                if superclass:
-                    self._end_scope()
-                self._current_class = enclosing_class
-            case ExprStmt(expr):
-                self.resolve(expr)
-            case FunctionStmt(name, params, body):
-                self._declare(name)
-                self._define(name)
-                self._resolve_fun(params, body, _FunctionType.FUNCTION)
-            case Get(object, _):
-                self.resolve(object)
-            case Grouping(expr):
-                self.resolve(expr)
-            case IfStmt(cond, then_branch, else_branch):
-                self.resolve(cond)
-                self.resolve(then_branch)
-                self.resolve(else_branch)
-            case Logical(left, _, right):
-                self.resolve(left)
-                self.resolve(right)
-            case PrintStmt(expr):
-                self.resolve(expr)
-            case ReturnStmt(keyword, value):
-                if self._current_fun == _FunctionType.NONE:
-                    self._logger.parse_error(keyword, 'Can’t return from top-level code')
-                if value and self._current_fun == _FunctionType.INITIALIZER:
-                    self._logger.parse_error(keyword, 'Can’t return a value from an initializer')
-                self.resolve(value)
-            case Set(object, _, value):
-                self.resolve(value)
-                self.resolve(object)
-            case Super(keyword, _):
-                if self ._current_class == _ClassType.NONE:
-                    self._logger.parse_error(keyword, 'Can’t use \'super\' outside of a class')
-                elif self._current_class != _ClassType.SUBCLASS:
-                    self._logger.parse_error(keyword, 'Can’t use \'super\' in a class with no superclass')
-                self._resolve_local(x, keyword)
-            case This(keyword):
-                if self._current_class == _ClassType.NONE:
-                    self._logger.parse_error(keyword, 'Can’t use \'this\' outside of a class')
-                self._resolve_local(x, keyword)
-            case Unary(_, expr):
-                self.resolve(expr)
-            case Variable(name):
-                if self._scopes and self._scopes[-1].get(name.lexeme) is False:
-                    self._logger.parse_error(name, 'Can’t read local variable in its own initializer')
-                self._resolve_local(x, name)
-            case VarStmt(name, init):
-                self._declare(name)
-                self.resolve(init)
-                self._define(name)
-            case WhileStmt(cond, body):
-                self.resolve(cond)
-                self.resolve(body)
+        if x is not None:
+            self._handlers[type(x)](x)
+
+    def _visit_assign(self, expr: Assign) -> None:
+        self.resolve(expr.value)
+        self._resolve_local(expr, expr.name)
+
+    def _visit_binary(self, expr: Binary) -> None:
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+
+    def _visit_block(self, stmt: Block) -> None:
+        stmt.scoped = any(isinstance(decl, Class | FunctionStmt | VarStmt) for decl in stmt.stmts)
+        if stmt.scoped:
+            self._begin_scope()
+        self.resolve_stmts(stmt.stmts)
+        if stmt.scoped:
+            self._end_scope()
+
+    def _visit_call(self, expr: Call) -> None:
+        self.resolve(expr.callee)
+        for arg in expr.args:
+            self.resolve(arg)
+
+    def _visit_class(self, stmt: Class) -> None:
+        enclosing_class = self._current_class
+        self._current_class = _ClassType.CLASS
+
+        self._declare(stmt.name, defined = True)
+
+        superclass = stmt.superclass
+        if superclass:
+            if stmt.name.lexeme == superclass.name.lexeme:
+                self._logger.parse_error(superclass.name, 'a class can’t inherit from itself')
+
+            self._current_class = _ClassType.SUBCLASS
+            self.resolve(superclass)
+
+            self._begin_scope()
+            self._define_implicit('super')
+
+        self._begin_scope()
+        self._define_implicit('this')
+
+        for method in stmt.methods:
+            decl = _FunctionType.INITIALIZER if method.name.lexeme == 'init' else _FunctionType.METHOD
+            self._resolve_fun(method.params, method.body, decl)
+
+        self._end_scope()
+        if superclass:
+            self._end_scope()
+        self._current_class = enclosing_class
+
+    def _visit_expr_stmt(self, stmt: ExprStmt) -> None:
+        self.resolve(stmt.expr)
+
+    def _visit_function_stmt(self, stmt: FunctionStmt) -> None:
+        self._declare(stmt.name, defined = True)
+        self._resolve_fun(stmt.params, stmt.body, _FunctionType.FUNCTION)
+
+    def _visit_get(self, expr: Get) -> None:
+        self.resolve(expr.object)
+
+    def _visit_grouping(self, expr: Grouping) -> None:
+        self.resolve(expr.expr)
+
+    def _visit_if_stmt(self, stmt: IfStmt) -> None:
+        self.resolve(stmt.cond)
+        self.resolve(stmt.then_branch)
+        self.resolve(stmt.else_branch)
+
+    def _visit_literal(self, expr: Literal) -> None:
+        pass
+
+    def _visit_logical(self, expr: Logical) -> None:
+        self.resolve(expr.left)
+        self.resolve(expr.right)
+
+    def _visit_print_stmt(self, stmt: PrintStmt) -> None:
+        self.resolve(stmt.expr)
+
+    def _visit_return_stmt(self, stmt: ReturnStmt) -> None:
+        if self._current_fun == _FunctionType.NONE:
+            self._logger.parse_error(stmt.keyword, 'Can’t return from top-level code')
+        if stmt.value and self._current_fun == _FunctionType.INITIALIZER:
+            self._logger.parse_error(stmt.keyword, 'Can’t return a value from an initializer')
+        self.resolve(stmt.value)
+
+    def _visit_set(self, expr: Set) -> None:
+        self.resolve(expr.value)
+        self.resolve(expr.object)
+
+    def _visit_super(self, expr: Super) -> None:
+        if self._current_class == _ClassType.NONE:
+            self._logger.parse_error(expr.keyword, 'Can’t use \'super\' outside of a class')
+        elif self._current_class != _ClassType.SUBCLASS:
+            self._logger.parse_error(expr.keyword, 'Can’t use \'super\' in a class with no superclass')
+        self._resolve_local(expr, expr.keyword)
+
+    def _visit_this(self, expr: This) -> None:
+        if self._current_class == _ClassType.NONE:
+            self._logger.parse_error(expr.keyword, 'Can’t use \'this\' outside of a class')
+        self._resolve_local(expr, expr.keyword)
+
+    def _visit_unary(self, expr: Unary) -> None:
+        self.resolve(expr.operand)
+
+    def _visit_variable(self, expr: Variable) -> None:
+        name = expr.name
+        if self._scopes and (local := self._scopes[-1].get(name.lexeme)) and not local.defined:
+            self._logger.parse_error(name, 'Can’t read local variable in its own initializer')
+        self._resolve_local(expr, name)
+
+    def _visit_var_stmt(self, stmt: VarStmt) -> None:
+        self._declare(stmt.name)
+        self.resolve(stmt.init)
+        self._define(stmt.name)
+
+    def _visit_while_stmt(self, stmt: WhileStmt) -> None:
+        self.resolve(stmt.cond)
+        self.resolve(stmt.body)
 
     def _begin_scope(self) -> None:
         self._scopes.append({})
 
     def _end_scope(self) -> None:
-        self._scopes.pop()
+        for name in self._scopes.pop():
+            self._bindings[name].pop()
 
-    def _declare(self, name: Token) -> None:
+    def _declare(self, name: Token, defined: bool = False) -> None:
         if not self._scopes:
             return
 
-        scope = self._scopes[-1]
-        if name.lexeme in scope:
+        if name.lexeme in self._scopes[-1]:
             self._logger.parse_error(name, 'Already a variable with this name in scope')
-        scope[name.lexeme] = False
+        self._add_local(name.lexeme, defined)
 
     def _define(self, name: Token) -> None:
         if not self._scopes:
             return
 
-        self._scopes[-1][name.lexeme] = True
+        self._scopes[-1][name.lexeme].defined = True
 
-    def _resolve_local(self, expr: Expr, name: Token) -> None:
-        depth = len(self._scopes) - 1
-        for i in range(depth, -1, -1):
-            if name.lexeme in self._scopes[i]:
-                self._interpreter.resolve(expr, depth - i)
-                return
+    def _define_implicit(self, name: str) -> None:
+        self._add_local(name, defined = True)
+
+    def _add_local(self, name: str, defined: bool = False) -> None:
+        scope = self._scopes[-1]
+        local = _Local(len(self._scopes) - 1, len(scope), defined)
+        bindings = self._bindings[name]
+        # A redeclaration (which is an error) replaces the previous local in the same scope.
+        if name in scope:
+            bindings[-1] = local
+        else:
+            bindings.append(local)
+        scope[name] = local
+
+    def _resolve_local(self, expr: Assign | Super | This | Variable, name: Token) -> None:
+        if bindings := self._bindings.get(name.lexeme):
+            local = bindings[-1]
+            self._interpreter.resolve(expr, len(self._scopes) - 1 - local.scope, local.slot)
 
     def _resolve_fun(self, params: list[Token], body: list[Stmt], type: _FunctionType) -> None:
         enclosing_fun = self._current_fun
@@ -169,8 +227,7 @@ class Resolver:
         self._begin_scope()
 
         for param in params:
-            self._declare(param)
-            self._define(param)
+            self._declare(param, defined = True)
 
         self.resolve_stmts(body)
         self._end_scope()
@@ -1,167 +1,139 @@
-from collections.abc import Iterable
+import re
+import sys
+from typing import cast
 
-from .log import Logger, position_from_offset
-from .token import Token, TokenType as T
+from .log import Logger
+from .token import TT, Token
 
 
-def scan(source: str, logger: Logger) -> Iterable[Token]:
+def scan(source: str, logger: Logger) -> list[Token]:
     return Scanner(source, logger).tokens()
 
 
 _KEYWORD_TOKENS = {
-    'and': T.AND,
-    'class': T.CLASS,
-    'else': T.ELSE,
-    'false': T.FALSE,
-    'for': T.FOR,
-    'fun': T.FUN,
-    'if': T.IF,
-    'nil': T.NIL,
-    'or': T.OR,
-    'print': T.PRINT,
-    'return': T.RETURN,
-    'super': T.SUPER,
-    'this': T.THIS,
-    'true': T.TRUE,
-    'var': T.VAR,
-    'while': T.WHILE
+    'and': TT.AND,
+    'class': TT.CLASS,
+    'else': TT.ELSE,
+    'false': TT.FALSE,
+    'for': TT.FOR,
+    'fun': TT.FUN,
+    'if': TT.IF,
+    'nil': TT.NIL,
+    'or': TT.OR,
+    'print': TT.PRINT,
+    'return': TT.RETURN,
+    'super': TT.SUPER,
+    'this': TT.THIS,
+    'true': TT.TRUE,
+    'var': TT.VAR,
+    'while': TT.WHILE
 }
 
 
+_OPERATOR_TOKENS = {
+    '(': TT.LEFT_PAREN,
+    ')': TT.RIGHT_PAREN,
+    '{': TT.LEFT_BRACE,
+    '}': TT.RIGHT_BRACE,
+    ',': TT.COMMA,
+    '.': TT.DOT,
+    '-': TT.MINUS,
+    '+': TT.PLUS,
+    ';': TT.SEMICOLON,
+    '/': TT.SLASH,
+    '*': TT.STAR,
+    '!': TT.BANG,
+    '!=': TT.BANG_EQ,
+    '=': TT.EQ,
+    '==': TT.EQ_EQ,
+    '>': TT.GT,
+    '>=': TT.GT_EQ,
+    '<': TT.LT,
+    '<=': TT.LT_EQ
+}
+
+
+# Whitespace and comments. Each run is matched in full (the lookaheads stop the regex engine from
+# backtracking into them), so that a comment cannot be mistaken for a `/` followed by other tokens.
+_SKIP = r'(?: [ \t\r\n]+ (?![ \t\r\n]) | //[^\n]* (?![^\n]) )*'
+
+# Each token, together with any whitespace and comments before it, is matched by a single call into
+# the regex engine, rather than by looking at its characters one at a time. Alternatives are tried
+# in order, so a terminated string takes precedence over an unterminated one. The end of the source
+# is matched like a token, so that the scanner does not need to check for it separately.
+_TOKEN = re.compile(_SKIP + r'''
+    (?: (?P<number> [0-9]+ (?: \.[0-9]+ )? )
+      | (?P<identifier> [A-Za-z_][A-Za-z0-9_]* )
+      | (?P<string> "[^"]*" )
+      | (?P<unterminated_string> "[^"]* )
+      | (?P<operator> [!=<>]=? | [(){},.\-+;*] | /(?!/) )
+      | (?P<end> \Z )
+    )
+''', re.VERBOSE)
+
+_SKIP_ONLY = re.compile(_SKIP, re.VERBOSE)
+
+
 class Scanner:
     def __init__(self, source: str, logger: Logger) -> None:
         self._source = source
         self._logger = logger
-        self._start = 0
-        self._pos = 0
-
-    def tokens(self) -> Iterable[Token]:
-        while not self._at_end():
-            self._start = self._pos
-            token = self._scan_token()
-            if token:
-                yield token
-        yield Token(T.EOF, '', None, self._pos, 0)
-
-    def _scan_token(self) -> Token | None:
-        match self._advance():
-            case '(':
-                return self._token(T.LEFT_PAREN)
-            case ')':
-                return self._token(T.RIGHT_PAREN)
-            case '{':
-                return self._token(T.LEFT_BRACE)
-            case '}':
-                return self._token(T.RIGHT_BRACE)
-            case ',':
-                return self._token(T.COMMA)
-            case '.':
-                return self._token(T.DOT)
-            case '-':
-                return self._token(T.MINUS)
-            case '+':
-                return self._token(T.PLUS)
-            case ';':
-                return self._token(T.SEMICOLON)
-            case '*':
-                return self._token(T.STAR)
-            case '!':
-                return self._token(T.BANG_EQ if self._match('=') else T.BANG)
-            case '=':
-                return self._token(T.EQ_EQ if self._match('=') else T.EQ)
-            case '<':
-                return self._token(T.LT_EQ if self._match('=') else T.LT)
-            case '>':
-                return self._token(T.GT_EQ if self._match('=') else T.GT)
-            case '/':
-                if self._match('/'):
-                    while self._peek() != '\n' and not self._at_end():
-                        self._advance()
-                    return None
-                else:
-                    return self._token(T.SLASH)
-            case ' ' | '\t' | '\r' | '\n':
-                return None
-            case  '"':
-                return self._string()
-            case c if _isdigit(c):
-                return self._number()
-            case c if _isalpha(c):
-                return self._identifier()
-        self._error('Unexpected character')
-        return None
-
-    def _string(self) -> Token | None:
-        # FIXME(klmr): Implement escape sequences.
-        while self._peek() != '"' and not self._at_end():
-            self._advance()
-        if self._at_end():
-            self._error('Unterminated string')
-            return None
-
-        # Skip closing quote.
-        self._advance()
-        return self._token(T.STRING, self._source[self._start + 1 : self._pos - 1])
-
-    def _number(self) -> Token:
-        while _isdigit(self._peek()):
-            self._advance()
-
-        if self._peek() == '.' and _isdigit(self._peek_next()):
-            self._advance()
-            while _isdigit(self._peek()):
-                self._advance()
-
-        value = float(self._source[self._start : self._pos])
-        return self._token(T.NUMBER, value)
-
-    def _identifier(self) -> Token:
-        while _isalnum(self._peek()):
-            self._advance()
-
-        ident = self._source[self._start : self._pos]
-        return self._token(_KEYWORD_TOKENS.get(ident, T.IDENTIFIER))
-
-    def _at_end(self) -> bool:
-        return self._pos >= len(self._source)
-
-    def _advance(self) -> str:
-        pos = self._pos
-        self._pos += 1
-        return self._source[pos]
-
-    def _match(self, expected: str) -> bool:
-        if self._at_end():
-            return False
-        if self._source[self._pos] != expected:
-            return False
-        self._pos += 1
-        return True
-
-    def _peek(self) -> str:
-        return '\0' if self._at_end() else self._source[self._pos]
-
-    def _peek_next(self) -> str:
-        return '\0' if self._pos + 1 >= len(self._source) else self._source[self._pos + 1]
-
-    def _token(self, type: T, literal: object = None) -> Token:
-        lexeme = self._source[self._start : self._pos]
-        return Token(type, lexeme, literal, self._pos, self._pos - self._start)
-
-    def _error(self, message: str) -> None:
-        self._logger.scan_error(self._position(), message)
-
-    def _position(self) -> tuple[int, int]:
-        return position_from_offset(self._source, self._pos)
-
-
-def _isdigit(c: str) -> bool:
-    return c >= '0' and c <= '9'
-
-
-def _isalpha(c: str) -> bool:
-    return (c >= 'a' and c <= 'z') or (c >= 'A' and c <= 'Z') or c == '_'
-
-
-def _isalnum(c: str) -> bool:
-    return _isalpha(c) or _isdigit(c)
+        # The position of the last error: since errors are reported in source order, the position of
+        # the next one is found by only looking at the source in between.
+        self._error_offset = 0
+        self._error_line = 1
+        self._error_line_start = 0
+
+    def tokens(self) -> list[Token]:
+        tokens: list[Token] = []
+        append = tokens.append
+        source = self._source
+        match = _TOKEN.match
+        # The globals and token types needed for every token are bound to locals once.
+        keyword_type = _KEYWORD_TOKENS.get
+        operator_types = _OPERATOR_TOKENS
+        intern = sys.intern
+        identifier_type, number_type, string_type = TT.IDENTIFIER, TT.NUMBER, TT.STRING
+        pos = 0
+
+        while True:
+            m = match(source, pos)
+            if m is None:
+                # The whitespace and comments here are followed by a character that does not start a
+                # token.
+                pos = cast(re.Match[str], _SKIP_ONLY.match(source, pos)).end() + 1
+                self._error(pos, 'Unexpected character')
+                continue
+
+            kind = cast(str, m.lastgroup)
+            start, pos = m.start(kind), m.end()
+            lexeme = m.group(kind)
+            if kind == 'operator':
+                append(Token(operator_types[lexeme], lexeme, None, pos, pos - start))
+            elif kind == 'identifier':
+                # Interned names make the environment and resolver dict lookups keyed on them cheaper.
+                ident = intern(lexeme)
+                append(Token(keyword_type(ident, identifier_type), ident, None, pos, pos - start))
+            elif kind == 'number':
+                append(Token(number_type, lexeme, float(lexeme), pos, pos - start))
+            elif kind == 'string':
+                # FIXME(klmr): Implement escape sequences.
+                append(Token(string_type, lexeme, lexeme[1 : -1], pos, pos - start))
+            elif kind == 'end':
+                break
+            else:
+                self._error(pos, 'Unterminated string')
+
+        append(Token(TT.EOF, '', None, pos, 0))
+        return tokens
+
+    def _error(self, offset: int, message: str) -> None:
+        self._logger.scan_error(self._position(offset), message)
+
+    def _position(self, offset: int) -> tuple[int, int]:
+        source, prev = self._source, self._error_offset
+        if (newlines := source.count('\n', prev, offset)) != 0:
+            self._error_line += newlines
+            self._error_line_start = source.rfind('\n', prev, offset) + 1
+        self._error_offset = offset
+        return self._error_line, offset - self._error_line_start
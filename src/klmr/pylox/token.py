@@ -1,66 +1,74 @@
 import enum
+from types import SimpleNamespace
 
 
-class AutoIncrement(enum.Enum):
-    def __new__(cls, *args):
-        value = len(cls.__members__) + 1
-        obj = object.__new__(cls)
-        obj._value_ = value
-        return obj
+# Token types are ints so that comparing and hashing them (as keys in dispatch tables) happens in C
+# rather than in `Enum`’s Python-level methods.
+class TokenType(enum.IntEnum):
+    LEFT_PAREN = enum.auto()
+    RIGHT_PAREN = enum.auto()
+    LEFT_BRACE = enum.auto()
+    RIGHT_BRACE = enum.auto()
+    COMMA = enum.auto()
+    DOT = enum.auto()
+    MINUS = enum.auto()
+    PLUS = enum.auto()
+    SEMICOLON = enum.auto()
+    SLASH = enum.auto()
+    STAR = enum.auto()
 
-
-class TokenType(AutoIncrement):
-    LEFT_PAREN = ()
-    RIGHT_PAREN = ()
-    LEFT_BRACE = ()
-    RIGHT_BRACE = ()
-    COMMA = ()
-    DOT = ()
-    MINUS = ()
-    PLUS = ()
-    SEMICOLON = ()
-    SLASH = ()
-    STAR = ()
-
-    BANG = ()
-    BANG_EQ = ()
-    EQ = ()
-    EQ_EQ = ()
-    GT = ()
-    GT_EQ = ()
-    LT = ()
-    LT_EQ = ()
+    BANG = enum.auto()
+    BANG_EQ = enum.auto()
+    EQ = enum.auto()
+    EQ_EQ = enum.auto()
+    GT = enum.auto()
+    GT_EQ = enum.auto()
+    LT = enum.auto()
+    LT_EQ = enum.auto()
 
     # Literals.
-    IDENTIFIER = ()
-    STRING = ()
-    NUMBER = ()
+    IDENTIFIER = enum.auto()
+    STRING = enum.auto()
+    NUMBER = enum.auto()
 
     # Keywords.
-    AND = ()
-    CLASS = ()
-    ELSE = ()
-    FALSE = ()
-    FUN = ()
-    FOR = ()
-    IF = ()
-    NIL = ()
-    OR = ()
-    PRINT = ()
-    RETURN = ()
-    SUPER = ()
-    THIS = ()
-    TRUE = ()
-    VAR = ()
-    WHILE = ()
+    AND = enum.auto()
+    CLASS = enum.auto()
+    ELSE = enum.auto()
+    FALSE = enum.auto()
+    FUN = enum.auto()
+    FOR = enum.auto()
+    IF = enum.auto()
+    NIL = enum.auto()
+    OR = enum.auto()
+    PRINT = enum.auto()
+    RETURN = enum.auto()
+    SUPER = enum.auto()
+    THIS = enum.auto()
+    TRUE = enum.auto()
+    VAR = enum.auto()
+    WHILE = enum.auto()
+
+    EOF = enum.auto()
 
-    EOF = ()
+    def __init__(self, *args: object) -> None:
+        # Each token type has its own bit, so that sets of token types can be represented as bit masks.
+        self.mask = 1 << self
 
     def __repr__(self) -> str:
         return f'<{type(self).__name__}.{self.name}>'
 
 
+# Before Python 3.12, looking up members on an enum class goes through its metaclass’s `__getattr__`,
+# which makes it several times slower than a plain attribute lookup. The scanner, parser and
+# interpreter look up token types on their hot paths, so they refer to them through this plain
+# namespace instead.
+TT = SimpleNamespace(**TokenType.__members__)
+
+
 class Token:
+    __slots__ = ('type', 'lexeme', 'literal', 'offset', 'length')
+
     def __init__(self, type: TokenType, lexeme: str, literal: object, offset: int, length: int) -> None:
         self.type = type
         self.lexeme = lexeme
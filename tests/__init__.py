@@ -1,6 +1,7 @@
 from .log import MockLogger
 
 from klmr.pylox.interpreter import Interpreter
+from klmr.pylox.optimizer import fold_constants
 from klmr.pylox.parser import parse
 from klmr.pylox.resolver import resolve
 from klmr.pylox.scanner import scan
@@ -11,6 +12,7 @@ def run_test(code: str) -> None:
     logger.reset(code)
     tokens = scan(code, logger)
     stmts = parse(tokens, logger)
+    fold_constants(stmts)
     interpreter = Interpreter(logger)
     resolve(logger, interpreter, stmts)
     interpreter.interpret(stmts)
@@ -0,0 +1,56 @@
+import pytest
+
+from klmr.pylox.ast import Variable, format_ast, make_literal
+from klmr.pylox.parser import parse
+from klmr.pylox.scanner import scan
+from klmr.pylox.token import Token, TokenType
+
+from .log import MockLogger
+
+
+def format_code(code: str) -> list[str]:
+    logger = MockLogger()
+    return [format_ast(stmt) for stmt in parse(scan(code, logger), logger)]
+
+
+format_tests = [
+    ('print -answer * (2 + 5);', '(print (* (- answer) (group (+ 2.0 5.0))))'),
+    ('a = b or c and d;', '(= a (or b (and c d)))'),
+    ('1 - 2 - 3 * 4 / 5;', '(- (- 1.0 2.0) (/ (* 3.0 4.0) 5.0))'),
+    ('a == b < c + d * -e;', '(== a (< b (+ c (* d (- e)))))'),
+    ('a * b + c >= d != e;', '(!= (>= (+ (* a b) c) d) e)'),
+    ('a or b == c and !d or e;', '(or (or a (and (== b c) (! d))) e)'),
+    ('egg.scramble(3).with(cheddar);', '((. ((. egg scramble) 3.0) with) cheddar)'),
+    ('breakfast.omelette.meat = ham;', '(= (. (. breakfast omelette) meat) ham)'),
+    ('f(a, nil, "s");', '(f a None s)'),
+    ('var x;', '(var x)'),
+    ('{ var x = nil; }', '({ (var x None))'),
+    ('while (true) print x;', '(while True (print x))'),
+    ('if (x) print 1; else print 2;', '(if x (print 1.0) (print 2.0))'),
+    ('fun f(a, b) { return a; }', '(def f (a b) (return a))'),
+    ('class A < B { m() { return super.m(this); } }', '(class A B (def m () (return ((super m) this))))')
+]
+
+
+@pytest.mark.parametrize('code,expected', format_tests)
+def test_format_ast(code: str, expected: str):
+    assert format_code(code) == [expected]
+
+
+def test_literals_are_shared():
+    stmts = format_code('print 1 == true; print 1;')
+    assert stmts == ['(print (== 1.0 True))', '(print 1.0)']
+
+    assert make_literal(1.0) is make_literal(1.0)
+    assert make_literal(1.0) is not make_literal(True)
+    assert make_literal(0.0) is not make_literal(False)
+
+
+def test_nodes_compare_by_identity():
+    first, second = (Variable(Token(TokenType.IDENTIFIER, 'x', None, 0, 1)) for _ in range(2))
+
+    assert first == first
+    assert first != second
+    assert len({first, second}) == 2
+    assert Variable.__eq__ is object.__eq__
+    assert Variable.__hash__ is object.__hash__
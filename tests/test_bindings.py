@@ -52,3 +52,53 @@ def test_top_level_return_error():
 
     with pytest.raises(LoxSyntaxError, match = 'at return: Can’t return from top-level code'):
         run_test(code)
+
+
+def test_local_slots(capsys: pytest.CaptureFixture):
+    code = '''
+    {
+        var a = "a";
+        class A {
+            m() { return a; }
+        }
+        class B < A {
+            m() {
+                var b = "b";
+                return super.m() + b;
+            }
+        }
+        var c = "c";
+        {
+            var a = "shadowed";
+            c = c + a;
+        }
+        print B().m() + c;
+    }
+    '''
+
+    run_test(code)
+    res = capsys.readouterr()
+    assert res.err == ''
+    assert res.out == 'abcshadowed\n'
+
+
+def test_blocks_without_declarations(capsys: pytest.CaptureFixture):
+    code = '''
+    fun f() {
+        var a = "outer";
+        {
+            {
+                fun g() { return a; }
+                a = "inner";
+                print g();
+            }
+            print a;
+        }
+    }
+    f();
+    '''
+
+    run_test(code)
+    res = capsys.readouterr()
+    assert res.err == ''
+    assert res.out == 'inner\ninner\n'
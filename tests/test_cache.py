@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+import pytest
+
+from klmr.pylox import cache, run
+from klmr.pylox.ast import format_ast
+from klmr.pylox.parser import parse
+from klmr.pylox.scanner import scan
+
+from .log import MockLogger
+
+
+@pytest.fixture(autouse = True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    return tmp_path / 'pylox'
+
+
+def test_cache_round_trip(cache_dir: Path):
+    code = '''
+    class A < B {
+        init(x) { this.x = x; }
+    }
+    for (var i = 0; i < 10; i = i + 1) print A(i).x;
+    '''
+    logger = MockLogger()
+    stmts = parse(scan(code, logger), logger)
+
+    assert cache.load(code) is None
+    cache.store(code, stmts)
+    assert len(list(cache_dir.rglob('*.pickle'))) == 1
+
+    cached = cache.load(code)
+    assert cached is not None
+    assert [format_ast(stmt) for stmt in cached] == [format_ast(stmt) for stmt in stmts]
+    assert cache.load(code + ' ') is None
+
+
+def test_corrupt_cache_entry_is_ignored(cache_dir: Path):
+    code = 'print 1;'
+    cache.store(code, [])
+    for entry in cache_dir.rglob('*.pickle'):
+        entry.write_bytes(b'garbage')
+
+    assert cache.load(code) is None
+
+
+def test_uncacheable_script_still_runs(cache_dir: Path, capsys: pytest.CaptureFixture):
+    # Deeply nested expressions exceed the recursion limit of `pickle`.
+    code = f'var a = 1; print {" + ".join(["a"] * 250)}; print "after";'
+    run(code, use_cache = True)
+
+    res = capsys.readouterr()
+    assert res.err == ''
+    assert res.out == '250\nafter\n'
+    assert not any(path.is_file() for path in cache_dir.rglob('*'))
+
+
+def test_store_prunes_stale_entries(cache_dir: Path):
+    old_version = cache_dir / 'v1'
+    old_version.mkdir(parents = True)
+    (old_version / 'entry.pickle').write_bytes(b'')
+    (cache_dir / 'unversioned.pickle').write_bytes(b'')
+
+    cache.store('print 1;', [])
+    (old_entry,) = cache_dir.rglob('*.pickle')
+    os.utime(old_entry, (0, 0))
+    cache.store('print 2;', [])
+
+    assert cache.load('print 1;') is None
+    assert cache.load('print 2;') == []
+    assert len(list(cache_dir.rglob('*'))) == 2
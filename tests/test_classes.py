@@ -136,3 +136,55 @@ def test_super_outside_class():
 
     with pytest.raises(LoxSyntaxError, match = ''):
         run_test(code)
+
+
+def test_method_lookup_site_sees_several_classes(capsys: pytest.CaptureFixture):
+    code = '''
+    class A { name() { return "A"; } }
+    class B < A { name() { return "B"; } }
+    class C < A {}
+
+    fun describe(object) { print object.name(); }
+    describe(A());
+    describe(B());
+    describe(C());
+    describe(B());
+
+    var shadowed = A();
+    shadowed.name = "field";
+    fun get(object) { return object.name; }
+    get(A());
+    print get(shadowed);
+    '''
+
+    run_test(code)
+    assert capsys.readouterr().out == 'A\nB\nA\nB\nfield\n'
+
+
+def test_method_call_prefers_fields(capsys: pytest.CaptureFixture):
+    code = '''
+    class A {
+        init(n) { this.n = n; }
+        f() { return "method " + this.n; }
+    }
+    fun g() { return "field"; }
+
+    var a = A("a");
+    print a.f();
+    a.f = g;
+    print a.f();
+    print A("b").init("c").f();
+    '''
+
+    run_test(code)
+    assert capsys.readouterr().out == 'method a\nfield\nmethod c\n'
+
+
+def test_method_call_arity():
+    code = '''
+    class A { f(x) {} }
+    A().f();
+    '''
+
+    with pytest.raises(LoxRuntimeError, match = 'Expected 1 arguments but got 0'):
+        run_test(code)
@@ -38,3 +38,65 @@ def test_arity():
 
     with pytest.raises(LoxRuntimeError, match = 'Expected 3 arguments but got 2'):
         run_test(fun + 'add(1, 2);')
+
+
+def test_return_unwinds_nested_statements(capsys: pytest.CaptureFixture):
+    code = '''
+    fun find(limit) {
+        for (var i = 0; i < 10; i = i + 1) {
+            {
+                if (i == limit) return i;
+            }
+            print i;
+        }
+        print "unreachable";
+    }
+    fun first() { while (true) return "first"; }
+    print find(2);
+    print first();
+    print "after";
+    '''
+
+    run_test(code)
+    assert capsys.readouterr().out == '0\n1\n2\nfirst\nafter\n'
+
+
+operator_errors = [
+    ('1 < "one";', 'Operands must be numbers'),
+    ('nil * 2;', 'Operands must be numbers'),
+    ('1 + "one";', 'Operands must be two numbers or two strings'),
+    ('-"one";', 'Operand must be a number'),
+    ('1 / 0;', 'Cannot divide by zero')
+]
+
+
+@pytest.mark.parametrize('code, message', operator_errors)
+def test_operator_type_errors(code: str, message: str):
+    with pytest.raises(LoxRuntimeError, match = message):
+        run_test(code)
+
+
+def test_equality(capsys: pytest.CaptureFixture):
+    run_test('print 1 == true; print 0 == false; print 0 != false; print nil == false;')
+    run_test('print -0 == 0; print "a" == "a";')
+    assert capsys.readouterr().out == 'false\nfalse\ntrue\nfalse\ntrue\ntrue\n'
+
+
+def test_print_numbers(capsys: pytest.CaptureFixture):
+    run_test('for (var i = 0; i < 2; i = i + 1) { print 0; print -0; print 3; print 2.5; print 1 / 3; }')
+    assert capsys.readouterr().out == '0\n-0\n3\n2.5\n0.3333333333333333\n' * 2
+
+
+def test_printf(capsys: pytest.CaptureFixture):
+    run_test('var i = 0; while (i < 2) { printf("{i} + 1 = {i + 1}"); i = i + 1; }')
+    assert capsys.readouterr().out == '0 + 1 = 1\n1 + 1 = 2\n'
+
+
+@pytest.mark.parametrize('placeholder, message', [
+    ('this', 'Undefined variable \'this\''),
+    ('super.method', 'Can’t use \'super\' outside of a class'),
+])
+def test_printf_unresolved(placeholder: str, message: str):
+    # `printf` placeholders are parsed at runtime, and never resolved.
+    with pytest.raises(LoxRuntimeError, match = message):
+        run_test(f'printf("{{{placeholder}}}");')
@@ -0,0 +1,75 @@
+import pytest
+
+from klmr.pylox import run
+from klmr.pylox.log import Logger, LoxLogger, LoxRuntimeError
+from klmr.pylox.scanner import scan
+from klmr.pylox.token import Token, TokenType
+
+
+source = 'var a;\n\nprint a +\n  b;'
+
+
+class CollectingLogger(Logger):
+    def __init__(self) -> None:
+        self.errors: list[tuple[tuple[int, int], str]] = []
+
+    def reset(self, source: str) -> None:
+        pass
+
+    def scan_error(self, position: tuple[int, int], message: str) -> None:
+        self.errors.append((position, message))
+
+    def parse_error(self, token: Token, message: str) -> None:
+        pass
+
+    def runtime_error(self, error: LoxRuntimeError) -> None:
+        pass
+
+
+def test_scanner_reports_positions():
+    logger = CollectingLogger()
+    scan('@var a;\n\nprint a #\n  b; ~ "open\nx', logger)
+
+    assert logger.errors == [
+        ((1, 1), 'Unexpected character'),
+        ((3, 9), 'Unexpected character'),
+        ((4, 6), 'Unexpected character'),
+        ((5, 1), 'Unterminated string'),
+    ]
+
+
+def test_logger_reports_positions(capsys: pytest.CaptureFixture):
+    logger = LoxLogger()
+    logger.reset(source)
+    logger.parse_error(Token(TokenType.IDENTIFIER, 'b', None, 20, 1), 'Oops')
+    logger.runtime_error(LoxRuntimeError(Token(TokenType.PLUS, '+', None, 16, 1), 'Oh no'))
+
+    assert capsys.readouterr().err == '[ln 4/col 2] Error at b: Oops\n[ln 3/col 8] Error: Oh no\n'
+    assert logger.had_error and logger.had_runtime_error
+
+
+def test_logger_collects_static_errors(capsys: pytest.CaptureFixture):
+    logger = LoxLogger()
+    logger.reset(source)
+    logger.scan_error((4, 5), 'Third')
+    logger.parse_error(Token(TokenType.EOF, '', None, 23, 0), 'Fourth')
+    logger.parse_error(Token(TokenType.IDENTIFIER, 'a', None, 5, 1), 'Second')
+    logger.scan_error((1, 2), 'First')
+
+    assert capsys.readouterr().err == ''
+    logger.flush()
+    assert capsys.readouterr().err == (
+        '[ln 1/col 2] Error: First\n[ln 1/col 5] Error at a: Second\n'
+        '[ln 4/col 5] Error: Third\n[ln 4/col 5] Error at end: Fourth\n'
+    )
+
+
+def test_run_reports_errors_in_source_order(capsys: pytest.CaptureFixture):
+    run('var a = @;\nprint 1;\nprint "unterminated')
+
+    assert capsys.readouterr().err == (
+        '[ln 1/col 9] Error: Unexpected character\n'
+        '[ln 1/col 10] Error at ;: Expected expression\n'
+        '[ln 3/col 19] Error: Unterminated string\n'
+        '[ln 3/col 19] Error at end: Expected expression\n'
+    )
@@ -0,0 +1,36 @@
+import pytest
+
+from klmr.pylox.ast import format_ast
+from klmr.pylox.optimizer import fold_constants
+from klmr.pylox.parser import parse
+from klmr.pylox.scanner import scan
+
+from .log import MockLogger
+
+
+def fold_code(code: str) -> list[str]:
+    logger = MockLogger()
+    stmts = parse(scan(code, logger), logger)
+    fold_constants(stmts)
+    return [format_ast(stmt) for stmt in stmts]
+
+
+fold_tests = [
+    ('print 1 + 2 * 3;', '(print 7.0)'),
+    ('print -(1 - 3);', '(print 2.0)'),
+    ('print !nil == true;', '(print True)'),
+    ('print "a" + "b";', '(print ab)'),
+    ('print x + 2 * 3;', '(print (+ x 6.0))'),
+    ('print f(1 < 2, -0);', '(print (f True -0.0))'),
+    ('while (i < 2 * 5) i = i + (1);', '(while (< i 10.0) (= i (+ i 1.0)))'),
+    ('fun f() { return 1 + 1; }', '(def f () (return 2.0))'),
+    ('print 1 / 0;', '(print (/ 1.0 0.0))'),
+    ('print 1 + "a";', '(print (+ 1.0 a))'),
+    ('print -"a";', '(print (- a))'),
+    ('print (a + (b)) * -(c);', '(print (* (+ a b) (- c)))')
+]
+
+
+@pytest.mark.parametrize('code,expected', fold_tests)
+def test_fold_constants(code: str, expected: str):
+    assert fold_code(code) == [expected]